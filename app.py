@@ -1,5 +1,9 @@
 # app.py
-from lib.cli import initial_menu
+import sys
+from lib.cli import cli, initial_menu
 
 if __name__ == "__main__":
-    initial_menu()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        cli()
+    else:
+        initial_menu()
\ No newline at end of file
@@ -0,0 +1,57 @@
+# benchmarks/bench_sqlite_writes.py
+import sys
+import os
+import argparse
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from lib.models import Base, Learner, make_engine, SQLITE_PROFILES
+
+def bench_profile(profile, sessions=2000, writers=4):
+    """Record PracticeSessions through Learner.add_session (one commit each) from several threads."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as session:
+            learners = [Learner(name=f"bench{i}", password="x", target_language="Spanish") for i in range(writers)]
+            session.add_all(learners)
+            session.commit()
+            learner_ids = [learner.id for learner in learners]
+        errors = []
+
+        def write(learner_id, count):
+            with Session() as session:
+                learner = session.get(Learner, learner_id)
+                for i in range(count):
+                    try:
+                        learner.add_session(session, score=i % 100)
+                    except OperationalError as e:  # "database is locked"
+                        session.rollback()
+                        errors.append(e)
+
+        per_writer = sessions // writers
+        threads = [threading.Thread(target=write, args=(learner_id, per_writer)) for learner_id in learner_ids]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+    written = per_writer * writers - len(errors)
+    return {'profile': profile, 'rows': written, 'seconds': elapsed, 'rows_per_sec': written / elapsed, 'lock_errors': len(errors)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare PracticeSession write throughput per SQLite profile.")
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--writers', type=int, default=4)
+    args = parser.parse_args()
+    for profile in SQLITE_PROFILES:
+        result = bench_profile(profile, args.sessions, args.writers)
+        print(f"{result['profile']:>8}: {result['rows']} rows in {result['seconds']:.2f}s "
+              f"({result['rows_per_sec']:.0f} rows/s, {result['lock_errors']} lock errors)")
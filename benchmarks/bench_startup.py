@@ -0,0 +1,34 @@
+# benchmarks/bench_startup.py
+import sys
+import os
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def time_startup(runs=5):
+    """Wall-clock seconds for a cold `python app.py` to print the first menu and quit."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, 'app.py'], input='q\n', cwd=ROOT,
+                                capture_output=True, text=True)
+        durations.append(time.perf_counter() - start)
+        if 'Welcome to LinguaCLI!' not in result.stdout:
+            raise RuntimeError(f"app.py did not reach the first menu:\n{result.stderr}")
+    return durations
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold CLI startup time.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="Exit non-zero if the median startup is slower than this.")
+    args = parser.parse_args()
+    durations = time_startup(args.runs)
+    median = statistics.median(durations)
+    print(f"startup median {median:.3f}s (min {min(durations):.3f}s, max {max(durations):.3f}s, runs {args.runs})")
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"Startup regression: {median:.3f}s > {args.max_seconds:.3f}s")
+        sys.exit(1)
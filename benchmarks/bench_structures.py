@@ -0,0 +1,58 @@
+# benchmarks/bench_structures.py
+import sys
+import os
+import random
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.structures import DoublyLinkedList, GrammarTree, WeightedSampler
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def bench_review_list(size=100_000, seed=42):
+    rng = random.Random(seed)
+    terms = [f"word{rng.randrange(10 ** 9)}" for _ in range(size)]
+    dll = DoublyLinkedList()
+    results = {}
+    results['add'] = timed(lambda: [dll.add(t) for t in terms])
+    results['sort'] = timed(dll.sort)
+    results['resort_sorted'] = timed(dll.sort)
+    results['search'] = timed(lambda: [dll.search(t) for t in terms])
+    results['move_to_end'] = timed(lambda: [dll.move_to_end(t) for t in terms])
+    return results
+
+def bench_grammar_tree(size=100_000):
+    rules = [f"topic{i % 100:03d}: rule {i:07d}" for i in range(size)]
+    rules.sort()
+    tree = GrammarTree()
+    results = {}
+    # Sorted inserts are the worst case for an unbalanced BST
+    results['insert_sorted'] = timed(lambda: [tree.insert(r) for r in rules])
+    results['from_sorted'] = timed(lambda: GrammarTree.from_sorted(rules))
+    results['traverse'] = timed(lambda: tree.traverse_in_order(tree.root))
+    results['prefix'] = timed(lambda: list(tree.prefix("topic042:")))
+    return results
+
+def bench_weighted_sampler(size=100_000, seed=42):
+    rng = random.Random(seed)
+    # The local quiz's weights: mostly words scheduled ahead, some new, due or lapsed
+    weights = [rng.choice((0.5, 0.5, 0.5, 2.0, 4.0, 9.0)) for _ in range(size)]
+    sampler = WeightedSampler(rng=rng)
+    results = {}
+    results['set'] = timed(lambda: [sampler.set(i, w) for i, w in enumerate(weights)])
+    results['sample'] = timed(lambda: [sampler.sample() for _ in range(size)])
+    results['update'] = timed(lambda: [sampler.set(i, weights[-1 - i]) for i in range(size)])
+    results['sample_distinct'] = timed(lambda: [sampler.sample_distinct(10) for _ in range(1000)])
+    return results
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, seconds in bench_review_list(size).items():
+        print(f"DoublyLinkedList.{name} x{size}: {seconds:.3f}s")
+    for name, seconds in bench_grammar_tree(size).items():
+        print(f"GrammarTree.{name} x{size}: {seconds:.3f}s")
+    for name, seconds in bench_weighted_sampler(size).items():
+        print(f"WeightedSampler.{name} x{size}: {seconds:.3f}s")
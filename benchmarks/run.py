@@ -0,0 +1,206 @@
+# benchmarks/run.py
+"""
+Run the benchmark suite, write the timings as JSON and compare them with a stored baseline.
+
+    python benchmarks/run.py                      # all suites, compared with benchmarks/baseline.json
+    python benchmarks/run.py --suite structures --sizes 1000,100000
+    python benchmarks/run.py --check              # exit 1 when something regressed
+    python benchmarks/run.py --save-baseline      # record this machine's numbers as the new baseline
+"""
+import sys
+import os
+import argparse
+import contextlib
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+HERE = os.path.abspath(os.path.dirname(__file__))
+sys.path.append(os.path.abspath(os.path.join(HERE, '..')))
+sys.path.append(HERE)
+
+from bench_structures import bench_review_list, bench_grammar_tree, bench_weighted_sampler
+from lib.seed import pseudo_word
+
+SUITES = ('structures', 'models', 'flows')
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_HISTORY = {'learners': 200, 'words': 5_000, 'sessions': 100_000}
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+# Asks about seeded words so grading writes real review states
+CANNED_QUIZ = "".join(f"{i}. Question: What is '{pseudo_word(i - 1)}' in English? Answer: gloss {i}\n" for i in range(1, 6))
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def best_of(fn, repeat=3, calls=1):
+    """Fastest of repeat runs, as seconds per call."""
+    return min(timed(lambda: [fn() for _ in range(calls)]) for _ in range(repeat)) / calls
+
+def run_structures(sizes, repeat=3):
+    results = {}
+    for size in sizes:
+        # One pass at a million items takes seconds and is stable enough on its own
+        runs = 1 if size >= 1_000_000 else repeat
+        for prefix, bench in (('dll', bench_review_list), ('grammar_tree', bench_grammar_tree),
+                              ('sampler', bench_weighted_sampler)):
+            timings = [bench(size) for _ in range(runs)]
+            for op in timings[0]:
+                results[f"structures.{prefix}.{op}[{size}]"] = min(t[op] for t in timings)
+    return results
+
+def build_history(learners, words, sessions):
+    """Fill the configured database with a seeded synthetic history."""
+    from lib.models import Base, Session, get_engine
+    from lib.seed import generate_data
+    Base.metadata.create_all(get_engine())
+    with Session() as session:
+        generate_data(session, learners=learners, words=words, sessions=sessions, seed=1)
+
+def busiest_learner_id():
+    from lib.models import Session, LearnerStats
+    with Session() as session:
+        return session.query(LearnerStats.learner_id).order_by(LearnerStats.session_count.desc()).first()[0]
+
+def run_models(history, repeat=3):
+    from lib.models import Session, Learner
+    learner_id = busiest_learner_id()
+    label = f"sessions={history['sessions']}"
+
+    def progress():
+        with Session() as session:
+            Learner.get_progress(session, learner_id)
+
+    def weak_words():
+        with Session() as session:
+            session.get(Learner, learner_id).load_weak_words(session)
+
+    return {
+        f"models.get_progress[{label}]": best_of(progress, repeat, calls=20),
+        f"models.load_weak_words[{label}]": best_of(weak_words, repeat, calls=5),
+    }
+
+def run_flows(history, repeat=3):
+    """quiz_vocab and export_flashcards as the menu runs them, with the AI calls mocked out."""
+    import lib.cli
+    learner_id = busiest_learner_id()
+    label = f"sessions={history['sessions']}"
+    answers = [f"gloss {i}" if i % 2 else "wrong" for i in range(1, 6)] + ['r']
+
+    def quiz():
+        with patch('click.prompt', side_effect=list(answers)):
+            lib.cli.quiz_vocab()
+
+    def export():
+        with patch('click.prompt', return_value='r'):
+            lib.cli.export_flashcards()
+
+    chunks = [CANNED_QUIZ[i:i + 16] for i in range(0, len(CANNED_QUIZ), 16)]
+    cwd = os.getcwd()
+    # The menu's export writes flashcards.csv into the working directory
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, 'w') as devnull, \
+            patch('lib.helpers.call_ai', return_value=CANNED_QUIZ), \
+            patch('lib.helpers.call_ai_stream', side_effect=lambda *a, **k: iter(chunks)), \
+            contextlib.redirect_stdout(devnull):
+        os.chdir(tmp)
+        lib.cli.current_user_id = learner_id
+        try:
+            return {
+                f"flows.quiz_vocab[{label}]": best_of(quiz, repeat, calls=10),
+                f"flows.export_flashcards[{label}]": best_of(export, repeat),
+            }
+        finally:
+            lib.cli.end_context()
+            lib.cli.current_user_id = None
+            os.chdir(cwd)
+
+def run(suites=SUITES, sizes=DEFAULT_SIZES, history=None, repeat=3):
+    """Run the chosen suites and return {'meta': ..., 'results': {name: seconds}}."""
+    history = history or DEFAULT_HISTORY
+    results = {}
+    if 'structures' in suites:
+        results.update(run_structures(sizes, repeat))
+    if 'models' in suites or 'flows' in suites:
+        # Everything below talks to a throwaway database, never lingua.db
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            os.environ['LINGUA_CACHE_DISABLED'] = '1'
+            os.environ['OPENAI_API_KEY'] = ''
+            build_history(**history)
+            if 'models' in suites:
+                results.update(run_models(history, repeat))
+            if 'flows' in suites:
+                results.update(run_flows(history, repeat))
+            from lib.models import get_engine
+            get_engine().dispose()
+    meta = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'sizes': list(sizes),
+        'history': history,
+    }
+    return {'meta': meta, 'results': results}
+
+def compare(results, baseline, tolerance=0.5, min_delta=0.002):
+    """
+    Return (name, baseline_seconds, seconds) for every benchmark more than tolerance slower
+    than its baseline. Differences under min_delta seconds are treated as noise.
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        if base is not None and seconds > base * (1 + tolerance) and seconds - base > min_delta:
+            regressions.append((name, base, seconds))
+    return regressions
+
+def report(results, baseline):
+    for name, seconds in sorted(results.items()):
+        base = baseline.get(name)
+        change = f"{(seconds / base - 1) * 100:+7.1f}%" if base else "    new"
+        base_text = f"{base:10.4f}s" if base is not None else " " * 11
+        print(f"{name:60} {base_text} {seconds:10.4f}s {change}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the LinguaCLI benchmark suite.")
+    parser.add_argument('--suite', action='append', choices=SUITES, help="Repeat to run several; default all.")
+    parser.add_argument('--sizes', default=",".join(map(str, DEFAULT_SIZES)), help="Item counts for the structure benchmarks.")
+    parser.add_argument('--learners', type=int, default=DEFAULT_HISTORY['learners'])
+    parser.add_argument('--words', type=int, default=DEFAULT_HISTORY['words'])
+    parser.add_argument('--sessions', type=int, default=DEFAULT_HISTORY['sessions'])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark; the fastest counts.")
+    parser.add_argument('--output', '-o', default='benchmark-results.json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.5, help="Allowed slowdown before a regression, as a fraction.")
+    parser.add_argument('--check', action='store_true', help="Exit with status 1 if anything regressed.")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results to --baseline as well.")
+    args = parser.parse_args(argv)
+
+    history = {'learners': args.learners, 'words': args.words, 'sessions': args.sessions}
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    data = run(args.suite or SUITES, sizes, history, args.repeat)
+    with open(args.output, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    report(data['results'], baseline)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(data['results'], baseline, args.tolerance)
+    for name, base, seconds in regressions:
+        print(f"REGRESSION {name}: {base:.4f}s -> {seconds:.4f}s")
+    return 1 if regressions and args.check else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+# lib/actions.py
+import inspect
+import json
+import time
+from sqlalchemy.exc import IntegrityError
+from lib.models import Learner, Word, lesson_words
+from lib.grading import grade_many
+from lib.helpers import extract_quiz_term
+from lib import exporter, search
+from lib.structures import DoublyLinkedList
+
+class ActionError(Exception):
+    """An action that cannot run with the parameters it was given."""
+
+# Non-interactive versions of the menu actions. Each takes an open session plus keyword
+# parameters and returns a JSON-serializable dict, so the click commands and the batch
+# runner share them.
+
+def find_learner(session, name, cache=None):
+    if cache is not None and name in cache:
+        return cache[name]
+    learner = Learner.find_by_name(session, name) if name else None
+    if learner is None:
+        raise ActionError(f"Learner {name!r} not found")
+    if cache is not None:
+        cache[name] = learner
+    return learner
+
+def add_word(session, term, translation, part_of_speech=None, example_sentence=None, lesson_id=None):
+    if not isinstance(term, str) or not term.isalpha():
+        raise ActionError("Invalid term: Letters only (Unicode supported).")
+    if not isinstance(translation, str) or not translation:
+        raise ActionError("Missing translation.")
+    if Word.find_by_term(session, term):
+        return {'status': 'exists', 'term': term}
+    word = Word(term=term, translation=translation, part_of_speech=part_of_speech, example_sentence=example_sentence)
+    session.add(word)
+    try:
+        session.flush()
+        if lesson_id is not None:
+            session.execute(lesson_words.insert().values(lesson_id=lesson_id, word_id=word.id))
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return {'status': 'exists', 'term': term}
+    return {'status': 'added', 'term': term, 'id': word.id}
+
+def quiz_submit(session, learner, answers):
+    """
+    Grade answers ({'term', 'expected', 'response'}, or 'question' instead of 'term'),
+    schedule their reviews and record the practice session, as the quiz menu does.
+    """
+    if not answers:
+        raise ActionError("No answers to grade.")
+    pairs = [(answer['expected'], answer.get('response') or '') for answer in answers]
+    grades = grade_many(pairs, learner.proficiency_level)
+    terms = [answer.get('term') or extract_quiz_term(answer.get('question', '')) for answer in answers]
+    learner.grade_quiz_words(session, [(term, grade.quality) for term, grade in zip(terms, grades)])
+    correct = sum(grade.correct for grade in grades)
+    practice = learner.add_session(session, correct * (100 / len(grades)))
+    return {
+        'learner': learner.name,
+        'score': correct,
+        'total': len(grades),
+        'session_id': practice.id,
+        'level': learner.proficiency_level,
+        'grades': [{'term': term, 'quality': grade.quality, 'correct': grade.correct}
+                   for term, grade in zip(terms, grades)],
+    }
+
+def progress(session, learner):
+    return {
+        'learner': learner.name,
+        'level': learner.proficiency_level,
+        'sessions': learner.session_count,
+        'average': round(learner.get_average_score(), 2),
+        'fluency': round(learner.fluency_score, 2),
+    }
+
+def review(session, learner, limit=None):
+    learner.repetition_list = DoublyLinkedList()
+    learner.load_weak_words(session)
+    words = list(learner.review_weak_words())
+    return {'learner': learner.name, 'words': words[:limit] if limit else words}
+
+def export(session, learner, output='flashcards.csv', format='csv', gzip=False, since_last=False, target='default'):
+    if since_last:
+        return exporter.export_delta(session, learner, output, fmt=format, compress=gzip, target=target)
+    count = exporter.export_flashcards(session, learner, output, fmt=format, compress=gzip)
+    return {'learner': learner.name, 'output': output, 'cards': count}
+
+def search_words(session, query, limit=20):
+    return {'query': query, 'words': [{'term': word.term, 'translation': word.translation}
+                                      for word in search.search_words(session, query, limit=limit)]}
+
+# Batch action name -> (function, whether it takes a learner)
+ACTIONS = {
+    'add-word': (add_word, False),
+    'quiz-submit': (quiz_submit, True),
+    'progress': (progress, True),
+    'review': (review, True),
+    'export': (export, True),
+    'search': (search_words, False),
+}
+
+def run_action(session, record, learners=None):
+    """Run one batch record such as {"action": "progress", "learner": "Alice"}."""
+    params = dict(record)
+    name = params.pop('action', None)
+    if name not in ACTIONS:
+        raise ActionError(f"Unknown action {name!r}; choose from {', '.join(ACTIONS)}")
+    action, needs_learner = ACTIONS[name]
+    learner_name = params.pop('learner', None)
+    # Bind against the signature first, so a TypeError raised inside an action is not reported as bad parameters
+    try:
+        if needs_learner:
+            inspect.signature(action).bind(session, None, **params)
+        else:
+            inspect.signature(action).bind(session, **params)
+    except TypeError as e:
+        raise ActionError(f"Bad parameters for {name}: {e}") from e
+    if needs_learner:
+        return action(session, find_learner(session, learner_name, learners), **params)
+    return action(session, **params)
+
+class BatchReport:
+    """Totals for one batch run."""
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    @property
+    def actions_per_sec(self):
+        total = self.succeeded + self.failed
+        return total / self.seconds if self.seconds else 0.0
+
+def run_batch(session, lines, out, stop_on_error=False):
+    """
+    Run JSONL actions in order with one session, writing one JSON result line per
+    action to out. A failed action is rolled back and reported; the rest still run.
+    """
+    report = BatchReport()
+    learners = {}
+    start = time.perf_counter()
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ActionError("Each line must be a JSON object.")
+            result = {'line': line_no, 'ok': True, 'result': run_action(session, record, learners)}
+            report.succeeded += 1
+        except Exception as e:
+            # Whatever went wrong (a bad path, a constraint, a bug), only this action is lost
+            session.rollback()
+            # Learners cached before the rollback are expired, not detached, so the cache stays valid
+            error = str(e) if isinstance(e, (ActionError, ValueError)) else f"{type(e).__name__}: {e}"
+            result = {'line': line_no, 'ok': False, 'error': error}
+            report.failed += 1
+        out.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+        if stop_on_error and not result['ok']:
+            break
+    report.seconds = time.perf_counter() - start
+    return report
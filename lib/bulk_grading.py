@@ -0,0 +1,261 @@
+# lib/bulk_grading.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import bindparam, func, select, insert as core_insert
+from sqlalchemy.dialects.sqlite import insert
+from lib.config import getenv
+from lib.grading import grade_many
+from lib.importer import iter_records
+from lib.models import Learner, Word, PracticeSession, LearnerStats, ReviewState
+
+STAGES = ('parse', 'resolve', 'grade', 'write')
+
+class Sheet:
+    """One learner's graded-to-be quiz: (term, expected, response) answers from a submission file."""
+    __slots__ = ('learner', 'answers', 'lesson_id', 'submitted_at', 'line')
+
+    def __init__(self, learner, answers, lesson_id=None, submitted_at=None, line=None):
+        self.learner = learner
+        self.answers = answers
+        self.lesson_id = lesson_id
+        self.submitted_at = submitted_at
+        self.line = line
+
+class GradingReport:
+    def __init__(self):
+        self.sheets = 0
+        self.answers = 0
+        self.rejected = []  # (file:line, reason)
+        self.timings = dict.fromkeys(STAGES, 0.0)
+        self.seconds = 0.0  # wall clock for the whole run, not the sum of the stages
+
+    @property
+    def sheets_per_sec(self):
+        return self.sheets / self.seconds if self.seconds else 0.0
+
+    @property
+    def answers_per_sec(self):
+        return self.answers / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f"<GradingReport(sheets={self.sheets}, answers={self.answers}, rejected={len(self.rejected)}, seconds={self.seconds:.2f})>"
+
+def _parse_time(value):
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _answer(record):
+    expected = record.get('expected')
+    if not isinstance(expected, str) or not expected.strip():
+        raise ValueError("missing expected answer")
+    term = record.get('term') or None
+    response = record.get('response') or ''
+    if not isinstance(term, (str, type(None))) or not isinstance(response, str):
+        raise ValueError("term and response must be text")
+    return term, expected, response
+
+def parse_submissions(paths, report, fmt=None):
+    """
+    Read answer sheets from JSONL (one sheet per line, {"learner", "answers": [{"term",
+    "expected", "response"}], "lesson_id", "submitted_at"}) or CSV/TSV (one answer per row
+    with learner, term, expected, response and an optional sheet column to group by).
+    """
+    sheets = []
+    for path in paths:
+        grouped = {}
+        for line_no, record in iter_records(path, fmt):
+            where = f"{os.path.basename(path)}:{line_no}"
+            if record is None:
+                report.rejected.append((where, "unparseable line"))
+                continue
+            try:
+                if not isinstance(record.get('learner'), (str, type(None))):
+                    raise ValueError("learner must be a name")
+                if isinstance(record.get('answers'), list):
+                    if not isinstance(record.get('lesson_id'), (int, type(None))):
+                        raise ValueError("lesson_id must be an integer")
+                    answers = [_answer(answer) for answer in record['answers']]
+                    sheet = Sheet(record['learner'], answers, record.get('lesson_id'),
+                                  _parse_time(record.get('submitted_at')), where)
+                else:
+                    key = (record['learner'], record.get('sheet') or '')
+                    sheet = grouped.get(key)
+                    if sheet is None:
+                        sheet = grouped[key] = Sheet(record['learner'], [], line=where)
+                    sheet.answers.append(_answer(record))
+                    continue
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                report.rejected.append((where, f"bad sheet: {e}"))
+                continue
+            if not sheet.learner or not sheet.answers:
+                report.rejected.append((where, "missing learner or answers"))
+                continue
+            sheets.append(sheet)
+        sheets.extend(sheet for sheet in grouped.values() if sheet.learner)
+    return sheets
+
+def grade_chunk(chunk):
+    """Process-pool worker: [(level, [(expected, response), ...]), ...] -> a list of qualities per sheet."""
+    return [[grade.quality for grade in grade_many(pairs, level)] for level, pairs in chunk]
+
+def grade_sheets(jobs, workers=None, chunk_size=200):
+    """Grade (level, pairs) jobs, spread over a process pool when there is enough work to pay for one."""
+    workers = int(workers if workers is not None else getenv('LINGUA_GRADING_WORKERS', os.cpu_count() or 1))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        results = map(grade_chunk, chunks)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(grade_chunk, chunks))
+    return [qualities for chunk in results for qualities in chunk]
+
+REVIEW_COLUMNS = ('learner_id', 'word_id', 'ease', 'interval', 'repetitions', 'due_date', 'last_reviewed')
+
+def _review_upsert():
+    stmt = insert(ReviewState.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['learner_id', 'word_id'],
+        set_={column: stmt.excluded[column] for column in REVIEW_COLUMNS[2:]},
+    )
+
+class _Review:
+    """Unmapped copy of a review_states row, graded by ReviewState.grade without ORM attribute tracking."""
+    __slots__ = REVIEW_COLUMNS
+    MIN_EASE = ReviewState.MIN_EASE
+    PASS_QUALITY = ReviewState.PASS_QUALITY
+    MAX_INTERVAL = ReviewState.MAX_INTERVAL
+    grade = ReviewState.grade
+
+    def __init__(self, learner_id, word_id, ease=2.5, interval=0, repetitions=0, due_date=None, last_reviewed=None):
+        self.learner_id = learner_id
+        self.word_id = word_id
+        self.ease = ease
+        self.interval = interval
+        self.repetitions = repetitions
+        self.due_date = due_date
+        self.last_reviewed = last_reviewed
+
+def _graded_states(session, graded):
+    """
+    Apply ReviewState.grade to each (learner_id, word_id) in graded, starting from its stored
+    state, and return the rows for one upsert instead of flushing an object per word.
+    """
+    table = ReviewState.__table__.c
+    words_by_learner = {}
+    for learner_id, word_id in graded:
+        words_by_learner.setdefault(learner_id, []).append(word_id)
+    # One primary-key search per learner; SQLite would scan the table for a (learner_id, word_id) IN list
+    query = select(*(table[name] for name in REVIEW_COLUMNS)).where(
+        table.learner_id == bindparam('learner_id'), table.word_id.in_(bindparam('word_ids', expanding=True)))
+    existing = {}
+    for learner_id, word_ids in words_by_learner.items():
+        for row in session.execute(query, {'learner_id': learner_id, 'word_ids': word_ids}):
+            existing[(row.learner_id, row.word_id)] = row
+    rows = []
+    for key, grades in graded.items():
+        row = existing.get(key)
+        state = _Review(*row) if row is not None else _Review(*key)
+        for quality, when in grades:
+            state.grade(quality, when)
+        rows.append({column: getattr(state, column) for column in REVIEW_COLUMNS})
+    return rows
+
+def write_batch(session, batch, now):
+    """Record one transaction's worth of (sheet, learner_id, qualities): sessions, stats, reviews and levels."""
+    terms = {term for sheet, _, _ in batch for term, _, _ in sheet.answers if term}
+    word_ids = dict(session.query(Word.term, Word.id).filter(Word.term.in_(terms))) if terms else {}
+
+    graded = {}  # (learner_id, word_id) -> [(quality, when)] in submission order
+    rows = []
+    totals = {}
+    for sheet, learner_id, qualities in batch:
+        when = sheet.submitted_at or now
+        correct = sum(quality >= ReviewState.PASS_QUALITY for quality in qualities)
+        score = correct * (100 / len(qualities))
+        rows.append({'learner_id': learner_id, 'lesson_id': sheet.lesson_id, 'session_date': when,
+                     'score': score, 'feedback': ""})
+        count, total, last = totals.get(learner_id, (0, 0.0, when))
+        totals[learner_id] = (count + 1, total + score, max(last, when))
+        for (term, _, _), quality in zip(sheet.answers, qualities):
+            word_id = word_ids.get(term)
+            if word_id is not None:
+                graded.setdefault((learner_id, word_id), []).append((quality, when))
+
+    session.execute(core_insert(PracticeSession.__table__), rows)
+    session.execute(LearnerStats.upsert(), [
+        {'learner_id': learner_id, 'session_count': count, 'score_total': total, 'last_session_date': last}
+        for learner_id, (count, total, last) in totals.items()
+    ])
+    if graded:
+        session.execute(_review_upsert(), _graded_states(session, graded))
+    Learner.refresh_levels(session, list(totals))
+    session.commit()
+
+def resolve_learners(session, names):
+    """
+    Map each sheet name to (learner_id, proficiency_level), leaving out unknown names.
+    Uses Learner.find_by_name's rule: an exact match wins, then the oldest account whose
+    name matches case-insensitively, so "Alice" and "alice" stay separate learners.
+    """
+    exact = {}
+    folded = {}
+    rows = (session.query(Learner.id, Learner.name, Learner.proficiency_level)
+            .filter(func.lower(Learner.name).in_([func.lower(name) for name in names]))
+            .order_by(Learner.id))
+    for learner_id, name, level in rows:
+        exact[name] = (learner_id, level)
+        folded.setdefault(name.lower(), (learner_id, level))  # rows come oldest first
+    resolved = {}
+    for name in names:
+        match = exact.get(name) or folded.get(name.lower())
+        if match is not None:
+            resolved[name] = match
+    return resolved
+
+def grade_submissions(session, paths, fmt=None, workers=None, batch_size=500, chunk_size=200, now=None):
+    """
+    Parse answer sheets, grade them across a process pool and record one practice session
+    per sheet, batch_size sheets per transaction. Returns a GradingReport with per-stage timings.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    report = GradingReport()
+    now = now or datetime.now(timezone.utc)
+    began = time.perf_counter()
+
+    start = began
+    sheets = parse_submissions(paths, report, fmt)
+    report.timings['parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    learners = resolve_learners(session, {sheet.learner for sheet in sheets})
+    known = []
+    for sheet in sheets:
+        if sheet.learner in learners:
+            known.append(sheet)
+        else:
+            report.rejected.append((sheet.line, f"unknown learner {sheet.learner!r}"))
+    report.timings['resolve'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    jobs = [(learners[sheet.learner][1], [(expected, response) for _, expected, response in sheet.answers])
+            for sheet in known]
+    qualities = grade_sheets(jobs, workers, chunk_size)
+    report.timings['grade'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(known), batch_size):
+        batch = [(sheet, learners[sheet.learner][0], sheet_qualities)
+                 for sheet, sheet_qualities in zip(known[i:i + batch_size], qualities[i:i + batch_size])]
+        write_batch(session, batch, now)
+    session.expire_all()
+    report.timings['write'] = time.perf_counter() - start
+
+    report.sheets = len(known)
+    report.answers = sum(len(sheet.answers) for sheet in known)
+    report.seconds = time.perf_counter() - began
+    return report
@@ -1,12 +1,76 @@
 # lib/cli.py
 import click
-import getpass
 import csv
+import getpass
 import sys
-from lib.models import Session, Learner, Word
-from lib.helpers import generate_quiz, correct_grammar, simulate_convo, InvalidInputError, get_proficiency_levels
+from sqlalchemy.exc import IntegrityError
+from lib.models import Session, Learner, Word, LearnerStats
+from lib import actions, exporter, progress, search
+from lib.prefetch import prefetch_quiz, take_quiz
+from lib.grading import grade_answer
+from lib.helpers import stream_quiz, correct_grammar_stream, simulate_convo_stream, extract_quiz_term, InvalidInputError, get_proficiency_levels
 
 current_user_id = None  # Store ID instead of object to avoid detachment
+_context = None
+
+class LearnerContext:
+    """
+    One session and the logged-in learner, kept for the whole login so menu
+    actions stop re-querying the learner and rebuilding its structures.
+    Call refresh() after anything that changes the learner's data.
+    """
+
+    def __init__(self, learner_id):
+        self.learner_id = learner_id
+        self.session = Session()
+        self.learner = self.session.get(Learner, learner_id)
+        self._weak_words_loaded = False
+        self._local_quiz = None
+
+    def weak_words(self):
+        if not self._weak_words_loaded:
+            self.learner.load_weak_words(self.session)
+            self._weak_words_loaded = True
+        return self.learner.review_weak_words()
+
+    def local_quiz(self):
+        """Questions from the Word table weighted to this learner's reviews, for when no AI quiz is available."""
+        if self._local_quiz is None:
+            from lib.local_quiz import LocalQuiz
+            self._local_quiz = LocalQuiz(self.learner_id)
+        return self._local_quiz.questions(self.session)
+
+    def record_reviews(self, review_states):
+        if self._local_quiz is not None:
+            self._local_quiz.update(review_states)
+
+    def refresh(self):
+        from lib.structures import DoublyLinkedList
+        self.session.expire(self.learner)
+        self.learner.repetition_list = DoublyLinkedList()
+        self._weak_words_loaded = False
+
+    def close(self):
+        self.session.close()
+
+def get_context():
+    """Context for current_user_id, opened on first use; None if nobody is logged in."""
+    global _context
+    if not current_user_id:
+        return None
+    if _context is None or _context.learner_id != current_user_id:
+        end_context()
+        _context = LearnerContext(current_user_id)
+    if _context.learner is None:
+        end_context()
+        return None
+    return _context
+
+def end_context():
+    global _context
+    if _context is not None:
+        _context.close()
+        _context = None
 
 @click.group()
 def cli():
@@ -34,13 +98,17 @@ def log_in():
     name = click.prompt("Username")
     password = getpass.getpass("Password: ")
     session = Session()
+    # Exact name: "Alice" and "alice" can be different accounts
     learner = session.query(Learner).filter_by(name=name, password=password).first()
     if learner:
         current_user_id = learner.id
         click.echo(f"Logged in as {name}. Level: {learner.proficiency_level}")
+        prefetch_quiz(learner.target_language, learner.proficiency_level)
     else:
         click.echo("Invalid username or password.")
     session.close()
+    if learner:
+        get_context()
 
 def new_user():
     name = click.prompt("Username")
@@ -61,12 +129,207 @@ def new_user():
         click.echo("Error creating user (possible duplicate).")
     session.close()
 
-@cli.command(name='logout')
-def logout():
+def log_out():
     global current_user_id
     current_user_id = None
+    end_context()
     click.echo("Logged out.")
-    initial_menu()
+
+@cli.command(name='logout')
+def logout():
+    # The menus return to the initial menu themselves, so this only has to clear the login
+    log_out()
+
+@cli.command(name='rebuild-stats')
+@click.option('--learner-id', type=int, default=None, help="Only rebuild this learner's stats.")
+def rebuild_stats(learner_id):
+    session = Session()
+    count = LearnerStats.rebuild(session, learner_id)
+    click.echo(f"Rebuilt stats for {count} learner(s).")
+    session.close()
+
+@cli.command(name='import-words')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'tsv', 'jsonl']), default=None,
+              help="File format; guessed from the extension by default.")
+@click.option('--lesson-id', type=int, default=None, help="Also attach every imported word to this lesson.")
+@click.option('--batch-size', type=click.IntRange(min=1), default=900, show_default=True,
+              help="Rows per transaction; capped at 900.")
+def import_words_cmd(path, fmt, lesson_id, batch_size):
+    from lib.importer import import_words
+    session = Session()
+    try:
+        report = import_words(session, path, fmt=fmt, lesson_id=lesson_id, batch_size=batch_size)
+    except (ValueError, csv.Error) as e:
+        click.echo(f"Import failed: {e}")
+        session.close()
+        return
+    session.close()
+    click.echo(f"Imported {report.imported} words in {report.seconds:.2f}s ({report.rows_per_sec:.0f} rows/sec).")
+    if report.duplicates:
+        click.echo(f"Merged {report.duplicates} repeated terms (the last row wins).")
+    if report.rejected:
+        click.echo(f"Rejected {len(report.rejected)} rows:")
+        for line_no, reason in report.rejected[:20]:
+            click.echo(f"  line {line_no}: {reason}")
+
+@cli.command(name='grade-submissions')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'tsv', 'jsonl']), default=None,
+              help="File format; guessed from each extension by default.")
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help="Grading processes (default LINGUA_GRADING_WORKERS or CPU count).")
+@click.option('--batch-size', type=click.IntRange(min=1), default=500, show_default=True, help="Sheets written per transaction.")
+def grade_submissions_cmd(paths, fmt, workers, batch_size):
+    from lib.bulk_grading import grade_submissions
+    session = Session()
+    try:
+        report = grade_submissions(session, paths, fmt=fmt, workers=workers, batch_size=batch_size)
+    except ValueError as e:
+        click.echo(f"Grading failed: {e}")
+        session.close()
+        return
+    session.close()
+    click.echo(f"Graded {report.sheets} sheets ({report.answers} answers) in {report.seconds:.2f}s "
+               f"({report.sheets_per_sec:.0f} sheets/sec, {report.answers_per_sec:.0f} answers/sec).")
+    click.echo("  " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in report.timings.items()))
+    if report.rejected:
+        click.echo(f"Rejected {len(report.rejected)} sheets:")
+        for where, reason in report.rejected[:20]:
+            click.echo(f"  {where}: {reason}")
+
+@cli.command(name='export')
+@click.option('--learner', 'learner_name', required=True, help="Learner whose flashcards to export.")
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'anki', 'jsonl']), default='csv', show_default=True)
+@click.option('--output', '-o', default='flashcards.csv', show_default=True, help="Output path, or '-' for stdout.")
+@click.option('--gzip', 'compress', is_flag=True, help="Gzip the output (implied by a .gz path).")
+@click.option('--since-last', is_flag=True, help="Only words reached since the last --since-last export.")
+@click.option('--target', default='default', show_default=True, help="Sync target the watermark is kept for.")
+def export_cmd(learner_name, fmt, output, compress, since_last, target):
+    session = Session()
+    learner = Learner.find_by_name(session, learner_name)
+    if not learner:
+        click.echo("User not found.", err=True)
+        session.close()
+        return
+    if since_last:
+        manifest = exporter.export_delta(session, learner, output, fmt=fmt, compress=compress, target=target)
+        count = manifest['cards']
+    else:
+        count = exporter.export_flashcards(session, learner, output, fmt=fmt, compress=compress)
+    session.close()
+    click.echo(f"Exported {count} flashcards to {'stdout' if output == '-' else output}", err=True)
+
+@cli.command(name='search')
+@click.argument('query', required=False, default='')
+@click.option('--limit', default=20, show_default=True, help="Maximum number of results.")
+@click.option('--exact', is_flag=True, help="Match whole words only, not prefixes.")
+@click.option('--reindex', is_flag=True, help="Rebuild the search index before searching.")
+def search_cmd(query, limit, exact, reindex):
+    session = Session()
+    if reindex:
+        search.rebuild_index(session)
+        click.echo("Search index rebuilt.", err=True)
+    if query:
+        show_search_results(search.search_words(session, query, limit=limit, prefix=not exact))
+    session.close()
+
+def show_search_results(words):
+    if not words:
+        click.echo("No matching words.")
+    for word in words:
+        click.echo(f"{word.term} -> {word.translation}" + (f"  ({word.example_sentence})" if word.example_sentence else ""))
+
+@cli.command(name='history')
+@click.option('--learner', 'learner_name', required=True, help="Learner whose practice history to show.")
+@click.option('--before', type=int, help="Show sessions older than this session id (the cursor printed after a page).")
+@click.option('--page-size', default=20, show_default=True, type=click.IntRange(min=1))
+@click.option('--window', default=10, show_default=True, type=click.IntRange(min=1), help="Sessions in each rolling average.")
+@click.option('--weeks', default=12, show_default=True, help="Weeks in the weekly summary (0 to skip it).")
+def history_cmd(learner_name, before, page_size, window, weeks):
+    session = Session()
+    learner = Learner.find_by_name(session, learner_name)
+    if not learner:
+        click.echo("User not found.", err=True)
+        session.close()
+        return
+    if weeks and before is None:
+        show_weekly_summary(progress.weekly_summary(session, learner.id, weeks=weeks))
+    page = progress.history_page(session, learner.id, before=before, page_size=page_size, window=window)
+    show_history_page(page)
+    if page.has_more:
+        click.echo(f"\nMore: --before {page.next_cursor}")
+    session.close()
+
+def run_headless(action, learner_name=None, **params):
+    """Run one action from lib.actions in its own session; returns its result or None after reporting an error."""
+    session = Session()
+    try:
+        if learner_name is not None:
+            params['learner'] = actions.find_learner(session, learner_name)
+        return action(session, **params)
+    except actions.ActionError as e:
+        click.echo(str(e), err=True)
+        return None
+    finally:
+        session.close()
+
+@cli.command(name='add-word')
+@click.argument('term')
+@click.argument('translation')
+@click.option('--part-of-speech')
+@click.option('--example', 'example_sentence', help="Example sentence using the word.")
+@click.option('--lesson-id', type=int, help="Also add the word to this lesson.")
+def add_word_cmd(term, translation, part_of_speech, example_sentence, lesson_id):
+    result = run_headless(actions.add_word, term=term, translation=translation, part_of_speech=part_of_speech,
+                          example_sentence=example_sentence, lesson_id=lesson_id)
+    if result:
+        click.echo(f"Added word: {term} -> {translation}" if result['status'] == 'added' else "Word already exists.")
+
+@cli.command(name='quiz-submit')
+@click.option('--learner', 'learner_name', required=True)
+@click.option('--answer', 'answers', nargs=3, multiple=True, required=True, metavar='TERM EXPECTED RESPONSE',
+              help="One graded answer; repeat for each question.")
+def quiz_submit_cmd(learner_name, answers):
+    answers = [{'term': term, 'expected': expected, 'response': response} for term, expected, response in answers]
+    result = run_headless(actions.quiz_submit, learner_name, answers=answers)
+    if result:
+        for grade in result['grades']:
+            click.echo(f"{grade['term']}: {'correct' if grade['correct'] else 'wrong'} (quality {grade['quality']})")
+        click.echo(f"Score: {result['score']}/{result['total']}. Level: {result['level']}")
+
+@cli.command(name='progress')
+@click.option('--learner', 'learner_name', required=True)
+def progress_cmd(learner_name):
+    result = run_headless(actions.progress, learner_name)
+    if result:
+        click.echo(f"Progress for {result['learner']}: {result['sessions']} sessions, average score: "
+                   f"{result['average']:.2f}, fluency score: {result['fluency']:.2f}, level: {result['level']}")
+
+@cli.command(name='review')
+@click.option('--learner', 'learner_name', required=True)
+@click.option('--limit', type=int, help="Show at most this many words.")
+def review_cmd(learner_name, limit):
+    result = run_headless(actions.review, learner_name, limit=limit)
+    if result:
+        click.echo(f"Review list: {', '.join(result['words'])}" if result['words'] else "No weak words.")
+
+@cli.command(name='batch')
+@click.argument('path', type=click.File('r', encoding='utf-8'))
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', show_default=True,
+              help="Where to write one JSON result per action.")
+@click.option('--stop-on-error', is_flag=True, help="Stop at the first failed action.")
+def batch_cmd(path, output, stop_on_error):
+    """Run a JSONL file of actions (add-word, quiz-submit, progress, review, export, search) in one session."""
+    session = Session()
+    try:
+        report = actions.run_batch(session, path, output, stop_on_error=stop_on_error)
+    finally:
+        session.close()
+    click.echo(f"{report.succeeded} succeeded, {report.failed} failed in {report.seconds:.2f}s "
+               f"({report.actions_per_sec:.0f} actions/sec)", err=True)
+    if report.failed:
+        sys.exit(1)
 
 def add_word():
     global current_user_id
@@ -78,16 +341,22 @@ def add_word():
         click.echo("Invalid term: Letters only (Unicode supported).")
         return
     translation = click.prompt("Translation")
-    try:
-        session = Session()
-        word = Word(term=term, translation=translation)
-        session.add(word)
-        session.commit()
-        click.echo(f"Added word: {term} -> {translation}")
-    except IntegrityError:
-        session.rollback()
+    context = get_context()
+    if not context:
+        click.echo("User not found.")
+        return
+    session = context.session
+    if Word.find_by_term(session, term):
         click.echo("Word already exists.")
-    session.close()
+    else:
+        try:
+            word = Word(term=term, translation=translation)
+            session.add(word)
+            session.commit()
+            click.echo(f"Added word: {term} -> {translation}")
+        except IntegrityError:
+            session.rollback()
+            click.echo("Word already exists.")
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -98,47 +367,62 @@ def view_progress():
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
         return
-    progress = Learner.get_progress(session, learner.id)
-    click.echo(progress)
+    session, learner = context.session, context.learner
+    summary = Learner.get_progress(session, learner.id)
+    click.echo(summary)
     # Display proficiency criteria using tuples
     levels = get_proficiency_levels()
     click.echo("\nProficiency Level Criteria:")
     for level, min_score in levels:
         click.echo(f"{level}: Average score >= {min_score}")
-    session.close()
-    click.echo("\nq: Quit app\nr: Return to main menu")
-    choice = click.prompt("Enter choice")
-    if choice.lower() == 'q':
-        sys.exit(0)
+    show_weekly_summary(progress.weekly_summary(session, learner.id))
+    page = progress.history_page(session, learner.id)
+    while True:
+        show_history_page(page)
+        click.echo("\nn: Older sessions\nq: Quit app\nr: Return to main menu" if page.has_more
+                   else "\nq: Quit app\nr: Return to main menu")
+        choice = click.prompt("Enter choice")
+        if choice.lower() == 'n' and page.has_more:
+            page = progress.history_page(session, learner.id, before=page.next_cursor)
+            continue
+        if choice.lower() == 'q':
+            sys.exit(0)
+        break
+
+def show_history_page(page):
+    if not page.rows:
+        click.echo("\nNo practice sessions yet.")
+        return
+    click.echo("\nDate              Score  Rolling avg  Change")
+    for row in page.rows:
+        date = row.session_date.strftime('%Y-%m-%d %H:%M') if row.session_date else '-'
+        # Quiz scores are fractions of 100 (e.g. 66.67 for 2 of 3), so format as floats
+        change = f"{row.change:+.1f}" if row.change is not None else ''
+        click.echo(f"{date:17} {row.score:5.1f}  {row.rolling_avg:11.1f}  {change:>6}")
+
+def show_weekly_summary(weeks):
+    if not weeks:
+        return
+    click.echo("\nWeek of      Sessions  Average   Best  Worst  Change")
+    for week in weeks:
+        change = f"{week.change:+.1f}" if week.change is not None else ''
+        click.echo(f"{week.week:12} {week.sessions:8}  {week.average:7.1f}  {week.best:5.1f}  {week.worst:5.1f}  {change:>6}")
 
 def export_flashcards():
     global current_user_id
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
         return
-    words = set()
-    for s in learner.sessions:
-        if s.lesson:
-            words.update(s.lesson.words)
-    with open('flashcards.csv', 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(['term', 'translation'])
-        for word in words:
-            writer.writerow([word.term, word.translation])
+    exporter.export_flashcards(context.session, context.learner, 'flashcards.csv')
     click.echo("Exported to flashcards.csv")
-    session.close()
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -149,24 +433,16 @@ def review_words():
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
         return
-    learner.load_weak_words(session)
-    review_list = learner.review_weak_words()
+    review_list = context.weak_words()
     if review_list.head:
-        current = review_list.head
-        words = []
-        while current:
-            words.append(current.data)
-            current = current.next
+        words = list(review_list)
         click.echo(f"Review list: {', '.join(words)}")
     else:
         click.echo("No weak words.")
-    session.close()
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -177,30 +453,42 @@ def quiz_vocab():
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
-        return
-    questions = generate_quiz(learner)
-    if not questions:
-        click.echo("No quiz available. Try setting OPENAI_API_KEY.")
-        session.close()
         return
+    session, learner = context.session, context.learner
+    # A prefetched quiz if one is ready, otherwise questions are asked as they stream in
+    questions = take_quiz(learner.target_language, learner.proficiency_level) or stream_quiz(learner, context.local_quiz)
     score = 0
+    total = 0
+    graded = []
     for i, (q, ans) in enumerate(questions, 1):
+        total = i
         click.echo(f"\nQuestion {i}: {q}", nl=True)
         sys.stdout.flush()
         user_ans = click.prompt("Your answer")
-        if user_ans.strip().lower() == ans.strip().lower():
+        # Accents, articles and small typos are forgiven but graded lower for the review schedule
+        grade = grade_answer(ans, user_ans, learner.proficiency_level)
+        graded.append((extract_quiz_term(q), grade.quality))
+        if grade.exact:
             score += 1
             click.echo("Correct!")
+        elif grade.correct:
+            score += 1
+            click.echo(f"Correct! (exact answer: {ans})")
         else:
             click.echo(f"Wrong. Correct answer: {ans}")
-    click.echo(f"\nScore: {score}/{len(questions)}")
-    learner.add_session(session, score * (100 / len(questions)) if questions else 0)
-    session.close()
+    if not total:
+        click.echo("No quiz available. Try setting OPENAI_API_KEY.")
+        return
+    click.echo(f"\nScore: {score}/{total}")
+    # Review states are committed together with the session below
+    context.record_reviews(learner.grade_quiz_words(session, graded))
+    learner.add_session(session, score * (100 / total))
+    context.refresh()
+    # Level may have changed, so warm the pool for whatever comes next
+    prefetch_quiz(learner.target_language, learner.proficiency_level)
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -211,16 +499,15 @@ def practice_grammar():
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
         return
+    learner = context.learner
     sentence = click.prompt("Enter sentence")
-    feedback = correct_grammar(sentence, learner.target_language)
-    click.echo(feedback)
-    session.close()
+    for chunk in correct_grammar_stream(sentence, learner.target_language):
+        click.echo(chunk, nl=False)
+    click.echo()
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -231,21 +518,38 @@ def simulate_convo_cmd():
     if not current_user_id:
         click.echo("Log in first.")
         return
-    session = Session()
-    learner = session.query(Learner).filter_by(id=current_user_id).first()
-    if not learner:
+    context = get_context()
+    if not context:
         click.echo("User not found.")
-        session.close()
         return
+    learner = context.learner
     click.echo("Start conversation (type 'quit' to end).")
     while True:
         user_input = click.prompt("You")
         if user_input.lower() == 'quit':
             break
-        response, feedback = simulate_convo(learner, user_input)
-        click.echo(f"AI: {response}")
-        click.echo(f"Feedback: {feedback}")
-    session.close()
+        reply, get_feedback = simulate_convo_stream(learner, user_input)
+        click.echo("AI: ", nl=False)
+        for chunk in reply:
+            click.echo(chunk, nl=False)
+        click.echo()
+        click.echo(f"Feedback: {get_feedback()}")
+    click.echo("\nq: Quit app\nr: Return to main menu")
+    choice = click.prompt("Enter choice")
+    if choice.lower() == 'q':
+        sys.exit(0)
+
+def search_vocab():
+    global current_user_id
+    if not current_user_id:
+        click.echo("Log in first.")
+        return
+    context = get_context()
+    if not context:
+        click.echo("User not found.")
+        return
+    query = click.prompt("Search for")
+    show_search_results(search.search_words(context.session, query))
     click.echo("\nq: Quit app\nr: Return to main menu")
     choice = click.prompt("Enter choice")
     if choice.lower() == 'q':
@@ -257,7 +561,7 @@ def main_menu():
         click.echo("Log in first.")
         return
     while True:
-        click.echo("\nMain Menu:\n1: Add Word\n2: Vocab Quiz\n3: Grammar Practice\n4: Conversation\n5: View Progress\n6: Review Words\n7: Export Flashcards\n8: Logout\nr: Return")
+        click.echo("\nMain Menu:\n1: Add Word\n2: Vocab Quiz\n3: Grammar Practice\n4: Conversation\n5: View Progress\n6: Review Words\n7: Export Flashcards\n8: Logout\n9: Search Words\nr: Return")
         choice = click.prompt("Enter choice")
         if choice == '1':
             add_word()
@@ -274,8 +578,10 @@ def main_menu():
         elif choice == '7':
             export_flashcards()
         elif choice == '8':
-            logout()
-            break
+            log_out()
+            break  # Back to the initial menu loop rather than starting a new one
+        elif choice == '9':
+            search_vocab()
         elif choice.lower() == 'r':
             break  # Return to initial menu
         else:
@@ -0,0 +1,16 @@
+# lib/config.py
+import os
+
+_env_loaded = False
+
+def load_env():
+    """Read .env once, on first use rather than at import time."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def getenv(name, default=None):
+    load_env()
+    return os.getenv(name, default)
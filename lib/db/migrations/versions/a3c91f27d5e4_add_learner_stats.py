@@ -0,0 +1,41 @@
+"""Add learner_stats
+
+Revision ID: a3c91f27d5e4
+Revises: b51fdf84338c
+Create Date: 2026-10-18 12:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91f27d5e4'
+down_revision: Union[str, Sequence[str], None] = 'b51fdf84338c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('learner_stats',
+    sa.Column('learner_id', sa.Integer(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('score_total', sa.Float(), nullable=False),
+    sa.Column('last_session_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['learner_id'], ['learners.id'], ),
+    sa.PrimaryKeyConstraint('learner_id')
+    )
+    # Backfill from existing history
+    op.execute(
+        "INSERT INTO learner_stats (learner_id, session_count, score_total, last_session_date) "
+        "SELECT learner_id, COUNT(id), COALESCE(SUM(score), 0), MAX(session_date) "
+        "FROM practice_sessions GROUP BY learner_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('learner_stats')
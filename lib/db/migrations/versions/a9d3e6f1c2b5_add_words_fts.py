@@ -0,0 +1,54 @@
+"""Add words_fts full-text index
+
+Revision ID: a9d3e6f1c2b5
+Revises: f2b7c4e81a03
+Create Date: 2026-10-18 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6f1c2b5'
+down_revision: Union[str, Sequence[str], None] = 'f2b7c4e81a03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE words_fts USING fts5(term, translation, example_sentence, content='words', "
+        "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute("INSERT INTO words_fts(words_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')")
+    op.execute(
+        "CREATE TRIGGER words_fts_insert AFTER INSERT ON words BEGIN "
+        "INSERT INTO words_fts(rowid, term, translation, example_sentence) "
+        "VALUES (new.id, new.term, new.translation, new.example_sentence); END"
+    )
+    op.execute(
+        "CREATE TRIGGER words_fts_delete AFTER DELETE ON words BEGIN "
+        "INSERT INTO words_fts(words_fts, rowid, term, translation, example_sentence) "
+        "VALUES ('delete', old.id, old.term, old.translation, old.example_sentence); END"
+    )
+    op.execute(
+        "CREATE TRIGGER words_fts_update AFTER UPDATE ON words BEGIN "
+        "INSERT INTO words_fts(words_fts, rowid, term, translation, example_sentence) "
+        "VALUES ('delete', old.id, old.term, old.translation, old.example_sentence); "
+        "INSERT INTO words_fts(rowid, term, translation, example_sentence) "
+        "VALUES (new.id, new.term, new.translation, new.example_sentence); END"
+    )
+    # Index the words that already exist
+    op.execute("INSERT INTO words_fts(words_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS words_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS words_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS words_fts_insert")
+    op.execute("DROP TABLE IF EXISTS words_fts")
@@ -0,0 +1,37 @@
+"""Add password and unique name to learners
+
+Revision ID: b51fdf84338c
+Revises: 68f5442c6d66
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b51fdf84338c'
+down_revision: Union[str, Sequence[str], None] = '68f5442c6d66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The shipped lingua.db is stamped with this revision; it was generated locally and never
+    # committed, so it is restored here to keep that database on the chain.
+    # Existing rows get an empty password; the default is dropped again afterwards.
+    with op.batch_alter_table('learners') as batch_op:
+        batch_op.add_column(sa.Column('password', sa.String(), nullable=False, server_default=''))
+        batch_op.create_unique_constraint('uq_learners_name', ['name'])
+    with op.batch_alter_table('learners') as batch_op:
+        batch_op.alter_column('password', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('learners') as batch_op:
+        batch_op.drop_constraint('uq_learners_name', type_='unique')
+        batch_op.drop_column('password')
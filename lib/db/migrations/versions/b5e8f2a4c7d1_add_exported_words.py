@@ -0,0 +1,42 @@
+"""Add exported_words
+
+Revision ID: b5e8f2a4c7d1
+Revises: a9d3e6f1c2b5
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8f2a4c7d1'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e6f1c2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('exported_words',
+    sa.Column('learner_id', sa.Integer(), nullable=False),
+    sa.Column('target', sa.String(), nullable=False),
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['learner_id'], ['learners.id'], ),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('learner_id', 'target', 'word_id')
+    )
+    # Existing watermarks only know a session id; treat what those sessions reach today as exported
+    op.execute(
+        "INSERT INTO exported_words (learner_id, target, word_id) "
+        "SELECT DISTINCT w.learner_id, w.target, lw.word_id FROM export_watermarks w "
+        "JOIN practice_sessions ps ON ps.learner_id = w.learner_id AND ps.id <= w.last_session_id "
+        "JOIN lesson_words lw ON lw.lesson_id = ps.lesson_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('exported_words')
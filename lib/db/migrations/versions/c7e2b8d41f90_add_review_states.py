@@ -0,0 +1,41 @@
+"""Add review_states
+
+Revision ID: c7e2b8d41f90
+Revises: a3c91f27d5e4
+Create Date: 2026-10-18 12:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2b8d41f90'
+down_revision: Union[str, Sequence[str], None] = 'a3c91f27d5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('review_states',
+    sa.Column('learner_id', sa.Integer(), nullable=False),
+    sa.Column('word_id', sa.Integer(), nullable=False),
+    sa.Column('ease', sa.Float(), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.DateTime(), nullable=False),
+    sa.Column('last_reviewed', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['learner_id'], ['learners.id'], ),
+    sa.ForeignKeyConstraint(['word_id'], ['words.id'], ),
+    sa.PrimaryKeyConstraint('learner_id', 'word_id')
+    )
+    op.create_index('ix_review_states_learner_due', 'review_states', ['learner_id', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_review_states_learner_due', table_name='review_states')
+    op.drop_table('review_states')
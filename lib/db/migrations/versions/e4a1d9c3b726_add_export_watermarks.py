@@ -0,0 +1,35 @@
+"""Add export_watermarks
+
+Revision ID: e4a1d9c3b726
+Revises: c7e2b8d41f90
+Create Date: 2026-10-18 14:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a1d9c3b726'
+down_revision: Union[str, Sequence[str], None] = 'c7e2b8d41f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('export_watermarks',
+    sa.Column('learner_id', sa.Integer(), nullable=False),
+    sa.Column('target', sa.String(), nullable=False),
+    sa.Column('last_session_id', sa.Integer(), nullable=False),
+    sa.Column('exported_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['learner_id'], ['learners.id'], ),
+    sa.PrimaryKeyConstraint('learner_id', 'target')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('export_watermarks')
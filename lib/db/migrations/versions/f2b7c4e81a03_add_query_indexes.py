@@ -0,0 +1,36 @@
+"""Add indexes for hot query paths
+
+Revision ID: f2b7c4e81a03
+Revises: e4a1d9c3b726
+Create Date: 2026-10-18 15:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4e81a03'
+down_revision: Union[str, Sequence[str], None] = 'e4a1d9c3b726'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_practice_sessions_learner_date', 'practice_sessions', ['learner_id', 'session_date'], unique=False)
+    op.create_index('ix_practice_sessions_learner_lesson', 'practice_sessions', ['learner_id', 'lesson_id', 'score'], unique=False)
+    op.create_index('ix_lesson_words_word', 'lesson_words', ['word_id'], unique=False)
+    op.create_index('ix_learners_name_lower', 'learners', [sa.text('lower(name)')], unique=False)
+    op.create_index('ix_words_term_lower', 'words', [sa.text('lower(term)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_words_term_lower', table_name='words')
+    op.drop_index('ix_learners_name_lower', table_name='learners')
+    op.drop_index('ix_lesson_words_word', table_name='lesson_words')
+    op.drop_index('ix_practice_sessions_learner_lesson', table_name='practice_sessions')
+    op.drop_index('ix_practice_sessions_learner_date', table_name='practice_sessions')
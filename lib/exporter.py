@@ -0,0 +1,140 @@
+# lib/exporter.py
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import func, insert, select
+from lib.models import Word, PracticeSession, ExportWatermark, ExportedWord
+
+EXPORT_FORMATS = ('csv', 'anki', 'jsonl')
+FLASHCARD_COLUMNS = (Word.term, Word.translation, Word.part_of_speech, Word.example_sentence)
+
+def flashcard_rows(session, learner, batch_size=1000, query=None):
+    """
+    Yield (term, translation, part_of_speech, example_sentence) tuples for the
+    learner's practised words, streamed from one query without building ORM objects.
+    """
+    query = query if query is not None else learner.practiced_words(session)
+    for row in query.with_entities(*FLASHCARD_COLUMNS).yield_per(batch_size):
+        yield tuple(row)
+
+@contextmanager
+def open_output(path, compress=False):
+    """Text stream for path, or stdout for '-'; gzip when asked or when path ends in .gz."""
+    compress = compress or (path != '-' and path.endswith('.gz'))
+    if path == '-':
+        if not compress:
+            yield sys.stdout
+            sys.stdout.flush()
+            return
+        raw = gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb')
+    elif compress:
+        raw = gzip.open(path, 'wb')
+    else:
+        raw = open(path, 'wb')
+    stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    try:
+        yield stream
+    finally:
+        stream.close()
+
+def write_flashcards(rows, out, fmt='csv'):
+    """Write rows in the given format and return how many were written."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(['term', 'translation'])
+        for term, translation, _, _ in rows:
+            writer.writerow([term, translation])
+            count += 1
+    elif fmt == 'anki':
+        # Anki's plain-text import reads these header lines, then one note per line
+        out.write("#separator:tab\n#html:false\n#columns:Front\tBack\n")
+        for term, translation, _, _ in rows:
+            out.write(f"{_anki_field(term)}\t{_anki_field(translation)}\n")
+            count += 1
+    elif fmt == 'jsonl':
+        for term, translation, part_of_speech, example_sentence in rows:
+            out.write(json.dumps({'term': term, 'translation': translation, 'part_of_speech': part_of_speech,
+                                  'example_sentence': example_sentence}, ensure_ascii=False) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {', '.join(EXPORT_FORMATS)}")
+    return count
+
+def _anki_field(value):
+    return (value or '').replace('\t', ' ').replace('\n', ' ')
+
+def export_flashcards(session, learner, path='flashcards.csv', fmt='csv', compress=False, batch_size=1000):
+    """Stream the learner's flashcards to path ('-' for stdout). Returns the number of cards."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {', '.join(EXPORT_FORMATS)}")
+    with open_output(path, compress) as out:
+        return write_flashcards(flashcard_rows(session, learner, batch_size), out, fmt)
+
+def delta_query(session, learner, target, through_session_id):
+    """
+    Words practised through through_session_id that were never exported to target. Exported
+    words are recorded one by one, so a word attached to an already practised lesson after
+    an export still goes out in the next delta.
+    """
+    exported = select(ExportedWord.word_id).where(ExportedWord.learner_id == learner.id,
+                                                  ExportedWord.target == target)
+    return learner.practiced_words(session, through_session_id=through_session_id).filter(Word.id.not_in(exported))
+
+def manifest_path(path):
+    return f"{path}.manifest.json"
+
+def export_delta(session, learner, path='flashcards.csv', fmt='csv', compress=False, target='default',
+                 batch_size=1000, now=None):
+    """
+    Export only the practised words not yet exported to target, record them and advance
+    the session watermark, then write a manifest next to path. Returns the manifest dict.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; choose from {', '.join(EXPORT_FORMATS)}")
+    watermark = session.get(ExportWatermark, (learner.id, target))
+    since = watermark.last_session_id if watermark else 0
+    # Pin the upper bound first so sessions logged mid-export land in the next delta
+    through = (session.query(func.max(PracticeSession.id))
+               .filter(PracticeSession.learner_id == learner.id).scalar()) or 0
+    exported_ids = []
+
+    def rows():
+        query = delta_query(session, learner, target, through).with_entities(Word.id, *FLASHCARD_COLUMNS)
+        for word_id, *row in query.yield_per(batch_size):
+            exported_ids.append(word_id)
+            yield tuple(row)
+
+    with open_output(path, compress) as out:
+        count = write_flashcards(rows(), out, fmt)
+
+    exported_at = now or datetime.now(timezone.utc)
+    if watermark is None:
+        watermark = ExportWatermark(learner_id=learner.id, target=target)
+        session.add(watermark)
+    watermark.last_session_id = through
+    watermark.exported_at = exported_at
+    if exported_ids:
+        session.execute(insert(ExportedWord), [{'learner_id': learner.id, 'target': target, 'word_id': word_id}
+                                               for word_id in exported_ids])
+    session.commit()
+
+    manifest = {
+        'learner': learner.name,
+        'target': target,
+        'format': fmt,
+        'output': path,
+        'full': since == 0,
+        'since_session_id': since,
+        'through_session_id': through,
+        'cards': count,
+        'exported_at': exported_at.isoformat(),
+    }
+    if path != '-':
+        with open(manifest_path(path), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    return manifest
@@ -0,0 +1,155 @@
+# lib/grading.py
+import re
+import unicodedata
+from functools import lru_cache
+
+# Qualities on the SM-2 scale used by ReviewState.grade (3 and up is a pass)
+EXACT = 5
+NORMALIZED = 4  # right once case, accents, punctuation and articles are ignored
+TYPO = 3  # within the level's edit-distance allowance
+WRONG = 1
+
+# Leading articles dropped before comparing, for the languages the app teaches plus English
+ARTICLES = frozenset(
+    "the a an to "  # English, including the infinitive "to" in "to eat"
+    "el la los las un una unos unas "  # Spanish
+    "le les l une des du "  # French
+    "der die das dem den des ein eine einen einem einer "  # German
+    "il lo gli uno".split()  # Italian ("i" is left out so English "I" survives)
+)
+# (characters per allowed edit, most edits allowed) for each proficiency level
+TYPO_ALLOWANCE = {
+    'Beginner': (4, 3),
+    'Intermediate': (5, 2),
+    'Advanced': (7, 1),
+}
+_SEPARATORS = re.compile(r'[/,;]')
+_PARENTHESES = re.compile(r'\([^)]*\)')
+_NON_WORD = re.compile(r'[\W_]+')
+
+def fold(text):
+    """Lowercase text with accents removed and punctuation turned into single spaces."""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD.sub(' ', stripped).strip()
+
+def normalize(text):
+    """fold() plus dropping a leading article, unless the article is the whole answer."""
+    words = fold(text).split()
+    while len(words) > 1 and words[0] in ARTICLES:
+        words.pop(0)
+    return ' '.join(words)
+
+def accepted_answers(answer):
+    """The alternatives in an answer such as "hello / hi, hey (informal)"."""
+    answers = [part.strip() for part in _SEPARATORS.split(_PARENTHESES.sub('', answer))]
+    return [part for part in answers if part] or [answer.strip()]
+
+def max_edits(length, level):
+    per_chars, cap = TYPO_ALLOWANCE.get(level, TYPO_ALLOWANCE['Intermediate'])
+    return min(cap, length // per_chars)
+
+def bounded_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b if it is at most limit, else limit + 1.
+    Only the diagonal band of width 2 * limit + 1 is filled, and it stops as soon as
+    a whole row exceeds limit, so the cost is O(limit * len(a)) at worst.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if limit == 0:
+        return 0 if a == b else 1
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        ch = a[i - 1]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (ch != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost < over else over
+            if cost < best:
+                best = cost
+        if best > limit:
+            return over
+        previous = current
+    return previous[len(b)]
+
+class Grade:
+    """Outcome of grading one response."""
+    __slots__ = ('quality', 'expected', 'distance')
+
+    def __init__(self, quality, expected, distance=0):
+        self.quality = quality
+        self.expected = expected
+        self.distance = distance
+
+    @property
+    def correct(self):
+        return self.quality >= TYPO
+
+    @property
+    def exact(self):
+        return self.quality == EXACT
+
+    def __repr__(self):
+        return f"<Grade(quality={self.quality}, expected={self.expected!r}, distance={self.distance})>"
+
+class AnswerKey:
+    """An expected answer with its accepted alternatives normalized once, ready to grade responses."""
+
+    def __init__(self, answer, level='Intermediate'):
+        self.answer = answer
+        self.level = level
+        self.alternatives = accepted_answers(answer)
+        self.exact = {alternative.strip().lower(): alternative for alternative in self.alternatives}
+        self.normalized = {}
+        for alternative in self.alternatives:
+            self.normalized.setdefault(normalize(alternative), alternative)
+
+    def grade(self, response):
+        response = response.strip()
+        expected = self.exact.get(response.lower())
+        if expected is not None:
+            return Grade(EXACT, expected)
+        cleaned = normalize(response)
+        expected = self.normalized.get(cleaned)
+        if expected is not None:
+            return Grade(NORMALIZED, expected)
+        best = None
+        for target, alternative in self.normalized.items():
+            limit = max_edits(len(target), self.level)
+            if best is not None:
+                # Only a strictly closer alternative can replace the current best
+                limit = min(limit, best.distance - 1)
+            if limit > 0:
+                distance = bounded_distance(cleaned, target, limit)
+                if distance <= limit:
+                    best = Grade(TYPO, alternative, distance)
+        return best or Grade(WRONG, self.answer)
+
+@lru_cache(maxsize=4096)
+def answer_key(answer, level='Intermediate'):
+    """Cached AnswerKey, so the same question graded many times is only prepared once."""
+    return AnswerKey(answer, level)
+
+def grade_answer(expected, response, level='Intermediate'):
+    return answer_key(expected, level).grade(response)
+
+def grade_many(pairs, level='Intermediate'):
+    """Grade (expected, response) pairs in bulk; repeated pairs are graded once."""
+    seen = {}
+    grades = []
+    for expected, response in pairs:
+        key = (expected, response)
+        if key not in seen:
+            seen[key] = answer_key(expected, level).grade(response)
+        grades.append(seen[key])
+    return grades
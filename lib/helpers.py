@@ -1,45 +1,238 @@
 # lib/helpers.py
-import os
 import re
-from openai import OpenAI
-from dotenv import load_dotenv
-
-load_dotenv()
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+from lib.config import getenv
 
 class InvalidInputError(Exception):
     pass
 
-def call_ai(prompt, model='gpt-4o', temperature=0.7):
-    if not os.getenv('OPENAI_API_KEY'):
+_client = None
+_cache = None
+
+def get_client():
+    """OpenAI client, built on first use so the SDK is never imported on the startup path."""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=getenv('OPENAI_API_KEY'))
+    return _client
+
+def ai_timeout():
+    return float(getenv('LINGUA_AI_TIMEOUT', 30))
+
+def get_cache():
+    """Shared response cache configured from the environment, or None when disabled."""
+    global _cache
+    if getenv('LINGUA_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+    if _cache is None:
+        from lib.cache import ResponseCache
+        _cache = ResponseCache(
+            getenv('LINGUA_CACHE_PATH', '.lingua_cache.db'),
+            ttl=int(getenv('LINGUA_CACHE_TTL', 7 * 24 * 3600)),
+            max_entries=int(getenv('LINGUA_CACHE_MAX_ENTRIES', 1000)),
+        )
+    return _cache
+
+def build_messages(prompt):
+    return [{"role": "system", "content": "You are a helpful language tutor."}, {"role": "user", "content": prompt}]
+
+def call_ai(prompt, model='gpt-4o', temperature=0.7, use_cache=True, timeout=None):
+    if not getenv('OPENAI_API_KEY'):
         return None  # Signal fallback
+    messages = build_messages(prompt)
+    cache = get_cache() if use_cache else None
+    if cache:
+        key = cache.make_key(model, temperature, messages)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
     try:
-        response = client.chat.completions.create(
+        options = {'timeout': timeout} if timeout is not None else {}
+        response = get_client().chat.completions.create(
             model=model,
-            messages=[{"role": "system", "content": "You are a helpful language tutor."}, {"role": "user", "content": prompt}],
-            temperature=temperature
+            messages=messages,
+            temperature=temperature,
+            **options
         )
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
     except Exception as e:
         print(f"AI error: {e}")
         return None
+    if cache and content:
+        cache.set(key, content)
+    return content
 
-def generate_quiz(learner):
-    prompt = learner.generate_quiz_prompt()
-    response = call_ai(prompt)
-    if response:
-        # Parse response expecting format like "1. Question: ... Answer: ..."
-        questions = re.findall(r'\d+\.\s*Question:\s*(.*?)\s*Answer:\s*(.*?)(?=\n\d+\.|\Z)', response, re.DOTALL)
-        if questions:
-            return [(q.strip(), a.strip()) for q, a in questions]
+def call_ai_stream(prompt, model='gpt-4o', temperature=0.7, use_cache=True, timeout=None):
+    """
+    Yield the completion in chunks as they arrive. Yields nothing when no key is
+    set or the request fails, so callers can fall back exactly as with call_ai.
+    """
+    if not getenv('OPENAI_API_KEY'):
+        return
+    messages = build_messages(prompt)
+    cache = get_cache() if use_cache else None
+    if cache:
+        key = cache.make_key(model, temperature, messages)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+    parts = []
+    try:
+        options = {'timeout': timeout} if timeout is not None else {}
+        stream = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            **options
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        print(f"AI error: {e}")
+        return
+    # Only complete responses are cached
+    if cache and parts:
+        cache.set(key, ''.join(parts))
+
+def _stream_or(chunks, fallback):
+    streamed = False
+    for chunk in chunks:
+        streamed = True
+        yield chunk
+    if not streamed:
+        yield fallback
+
+_executor = None
+
+def get_executor():
+    """Thread pool shared by concurrent AI calls; created on first use."""
+    global _executor
+    if _executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _executor = ThreadPoolExecutor(max_workers=int(getenv('LINGUA_AI_WORKERS', 4)), thread_name_prefix='lingua-ai')
+    return _executor
+
+def submit_ai(prompt, **kwargs):
+    """Start call_ai in the background and return its Future."""
+    return get_executor().submit(call_ai, prompt, **kwargs)
+
+def call_ai_many(prompts, timeout=None, **kwargs):
+    """
+    Run independent prompts concurrently and return their responses in order.
+    A prompt that fails or is still running after `timeout` seconds yields None;
+    calls that have not started yet are cancelled.
+    """
+    if not getenv('OPENAI_API_KEY'):
+        return [None] * len(prompts)  # Fallback without spinning up threads
+    from concurrent.futures import wait
+    if timeout is not None:
+        kwargs.setdefault('timeout', timeout)
+    futures = [submit_ai(prompt, **kwargs) for prompt in prompts]
+    done, not_done = wait(futures, timeout=timeout)
+    for future in not_done:
+        future.cancel()
+    return [future.result() if future in done and future.exception() is None else None for future in futures]
+
+# Expected format: "1. Question: ... Answer: ..."
+QUIZ_PATTERN = re.compile(r'\d+\.\s*Question:\s*(.*?)\s*Answer:\s*(.*?)(?=\n\d+\.|\Z)', re.DOTALL)
+# Same pattern minus the end-of-text alternative: a block only counts as done once the next one starts.
+# The whitespace after "Answer:" must not be given back (with \Z available the full pattern never
+# does, and doing so on a partial buffer would end answers too early). (?=(\s*))\1 matches it
+# atomically; possessive \s*+ would too, but only exists from Python 3.11.
+_QUIZ_BLOCK_PATTERN = re.compile(r'\d+\.\s*Question:\s*(.*?)\s*Answer:(?=(\s*))\2(.*?)(?=\n\d+\.)', re.DOTALL)
+
+def parse_quiz(text):
+    return [(q.strip(), a.strip()) for q, a in QUIZ_PATTERN.findall(text)]
+
+class QuizStreamParser:
+    """
+    Incremental version of parse_quiz. feed() returns the pairs completed by
+    each chunk; close() returns whatever remains at the end of the stream.
+    Together they give the same result as parse_quiz on the full text.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        pairs = []
+        end = 0
+        for match in _QUIZ_BLOCK_PATTERN.finditer(self._buffer):
+            pairs.append((match.group(1).strip(), match.group(3).strip()))
+            end = match.end()
+        self._buffer = self._buffer[end:]
+        return pairs
+
+    def close(self):
+        pairs = parse_quiz(self._buffer)
+        self._buffer = ''
+        return pairs
+
+def quiz_prompt(target_language, proficiency_level):
+    if proficiency_level == 'Beginner':
+        return f"Create a simple quiz for beginner {target_language} learner on basic vocabulary."
+    elif proficiency_level == 'Intermediate':
+        return f"Create an intermediate quiz for {proficiency_level} {target_language} learner on grammar and vocabulary."
+    else:
+        return f"Create an advanced quiz for {proficiency_level} {target_language} learner on conversation and grammar."
+
+def generate_quiz(learner, fallback=None):
+    return generate_quiz_for(learner.target_language, learner.proficiency_level, fallback)
+
+def ai_quiz_for(target_language, proficiency_level):
+    """The AI's quiz for a language and level, or None when the API is unavailable or unparseable."""
+    response = call_ai(quiz_prompt(target_language, proficiency_level))
+    return (parse_quiz(response) if response else None) or None
+
+def generate_quiz_for(target_language, proficiency_level, fallback=None):
+    """
+    Quiz for a language and level; needs no learner, so it can run off the main thread.
+    Without an AI quiz, fallback() is asked for questions before the static fallback_quiz.
+    """
+    return (ai_quiz_for(target_language, proficiency_level)
+            or (fallback and fallback())
+            or fallback_quiz(target_language))
+
+def stream_quiz_for(target_language, proficiency_level, fallback=None):
+    """Yield (question, answer) pairs as soon as each one has fully streamed in."""
+    parser = QuizStreamParser()
+    received = False
+    parsed = False
+    for chunk in call_ai_stream(quiz_prompt(target_language, proficiency_level)):
+        received = True
+        for pair in parser.feed(chunk):
+            parsed = True
+            yield pair
+    for pair in parser.close():
+        parsed = True
+        yield pair
+    if parsed:
+        return
+    if received:
+        yield from (fallback and fallback()) or fallback_quiz(target_language)  # Got text, but nothing we could parse
+    else:
+        yield from generate_quiz_for(target_language, proficiency_level, fallback)
+
+def stream_quiz(learner, fallback=None):
+    return stream_quiz_for(learner.target_language, learner.proficiency_level, fallback)
+
+def fallback_quiz(target_language):
     # Fallback static quiz
-    if learner.target_language == "Spanish":
+    if target_language == "Spanish":
         return [
             ("What is 'hola' in English?", "hello"),
             ("What is 'gracias' in English?", "thank you"),
             ("What is 'amigo' in English?", "friend")
         ]
-    elif learner.target_language == "French":
+    elif target_language == "French":
         return [
             ("What is 'bonjour' in English?", "hello"),
             ("What is 'merci' in English?", "thank you"),
@@ -52,27 +245,73 @@ def generate_quiz(learner):
             ("What is 'friend' in your language?", "Provide the translation")
         ]
 
+# Quotes must open and close a word, so an apostrophe inside a term ("l'eau") is kept
+_QUOTED_TERM = re.compile(r"(?<!\w)['\"\u2018\u201c](.+?)['\"\u2019\u201d](?!\w)")
+
+def extract_quiz_term(question):
+    """Pull the quoted term out of questions like "What is 'hola' in English?"."""
+    match = _QUOTED_TERM.search(question)
+    return match.group(1).strip() if match else None
+
+def grammar_prompt(user_sentence, target_language):
+    return f"Correct this {target_language} sentence: '{user_sentence}' and explain errors."
+
+def grammar_fallback(user_sentence):
+    return f"Fallback: Corrected sentence not available. Example: Try '{user_sentence}' with proper punctuation."
+
 def correct_grammar(user_sentence, target_language):
-    prompt = f"Correct this {target_language} sentence: '{user_sentence}' and explain errors."
-    response = call_ai(prompt)
+    response = call_ai(grammar_prompt(user_sentence, target_language))
     if response:
         return response
     # Fallback
-    return f"Fallback: Corrected sentence not available. Example: Try '{user_sentence}' with proper punctuation."
+    return grammar_fallback(user_sentence)
 
-def simulate_convo(learner, user_input):
-    prompt = f"Respond in {learner.target_language} to: '{user_input}'. Keep it conversational for {learner.proficiency_level} level."
-    response = call_ai(prompt)
-    feedback_prompt = f"Provide feedback on user's input: '{user_input}' in {learner.target_language}."
-    feedback = call_ai(feedback_prompt)
-    if response and feedback:
-        return response, feedback
-    # Fallback
+def correct_grammar_stream(user_sentence, target_language):
+    """Like correct_grammar, but yields the correction as it is generated."""
+    chunks = call_ai_stream(grammar_prompt(user_sentence, target_language), timeout=ai_timeout())
+    return _stream_or(chunks, grammar_fallback(user_sentence))
+
+def convo_prompts(learner, user_input):
+    return (
+        f"Respond in {learner.target_language} to: '{user_input}'. Keep it conversational for {learner.proficiency_level} level.",
+        f"Provide feedback on user's input: '{user_input}' in {learner.target_language}."
+    )
+
+def convo_fallback(learner):
     return (
         f"Fallback: Sample {learner.target_language} response for {learner.proficiency_level}.",
         "Fallback: Ensure your input matches the target language."
     )
 
+def simulate_convo(learner, user_input):
+    prompt, feedback_prompt = convo_prompts(learner, user_input)
+    # Reply and feedback are independent, so the turn costs max(reply, feedback) rather than the sum
+    response, feedback = call_ai_many([prompt, feedback_prompt], timeout=ai_timeout())
+    if response and feedback:
+        return response, feedback
+    # Fallback
+    return convo_fallback(learner)
+
+def simulate_convo_stream(learner, user_input):
+    """
+    Return (reply_chunks, get_feedback). The feedback request runs in the
+    background while the reply streams; get_feedback() waits for it.
+    """
+    prompt, feedback_prompt = convo_prompts(learner, user_input)
+    fallback_reply, fallback_feedback = convo_fallback(learner)
+    future = submit_ai(feedback_prompt, timeout=ai_timeout()) if getenv('OPENAI_API_KEY') else None
+
+    def get_feedback():
+        if future is None:
+            return fallback_feedback
+        try:
+            return future.result(timeout=ai_timeout()) or fallback_feedback
+        except Exception:
+            future.cancel()
+            return fallback_feedback
+
+    return _stream_or(call_ai_stream(prompt, timeout=ai_timeout()), fallback_reply), get_feedback
+
 def get_proficiency_levels():
     """
     Returns a tuple of tuples containing proficiency levels and their minimum score thresholds.
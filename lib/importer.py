@@ -0,0 +1,137 @@
+# lib/importer.py
+import csv
+import json
+import os
+import time
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+from lib.models import Word, Lesson, lesson_words
+
+FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.txt': 'tsv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+FIELDS = ('term', 'translation', 'part_of_speech', 'example_sentence')
+# The lesson link lookup binds one parameter per term; SQLite before 3.32 allows 999 in all
+MAX_BATCH = 900
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = []  # (line number, reason)
+        self.duplicates = 0  # rows replaced by a later row for the same term in the same batch
+        self.seconds = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.imported / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (f"<ImportReport(imported={self.imported}, rejected={len(self.rejected)}, "
+                f"duplicates={self.duplicates}, seconds={self.seconds:.2f})>")
+
+def detect_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the format of {path}; pass one of: csv, tsv, jsonl")
+    return fmt
+
+def _is_utf8(values):
+    # Undecodable bytes come through as lone surrogates (errors='surrogateescape')
+    try:
+        for value in values:
+            if isinstance(value, str):
+                value.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+def iter_records(path, fmt=None):
+    """
+    Stream (line number, record dict or None) pairs; None marks a line that could not be parsed,
+    including CSV rows the csv module rejects (e.g. over-long fields) and bytes that are not UTF-8.
+    """
+    fmt = fmt or detect_format(path)
+    with open(path, newline='', encoding='utf-8', errors='surrogateescape') as f:
+        if fmt == 'jsonl':
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line) if _is_utf8([line]) else None
+                except json.JSONDecodeError:
+                    record = None
+                yield line_no, record if isinstance(record, dict) else None
+        else:
+            reader = csv.DictReader(f, delimiter='\t' if fmt == 'tsv' else ',')
+            while True:
+                last_line = reader.line_num
+                try:
+                    record = next(reader)
+                except StopIteration:
+                    return
+                except csv.Error:
+                    # The reader skips to the next line; report the line the bad row started on
+                    yield last_line + 1, None
+                    continue
+                yield reader.line_num, record if _is_utf8(record.values()) else None
+
+def clean_record(record):
+    """Return (row, None) for a usable record or (None, reason) for a rejected one."""
+    if record is None:
+        return None, "unparseable line"
+    row = {}
+    for field in FIELDS:
+        value = record.get(field)
+        row[field] = value.strip() if isinstance(value, str) and value.strip() else None
+    if not row['term']:
+        return None, "missing term"
+    if not row['translation']:
+        return None, "missing translation"
+    return row, None
+
+def _upsert_statement():
+    stmt = insert(Word.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=['term'],
+        set_={
+            'translation': stmt.excluded.translation,
+            # Keep existing details when the import leaves them blank
+            'part_of_speech': func.coalesce(stmt.excluded.part_of_speech, Word.__table__.c.part_of_speech),
+            'example_sentence': func.coalesce(stmt.excluded.example_sentence, Word.__table__.c.example_sentence),
+        },
+    )
+
+def _flush(session, batch, lesson_id):
+    rows = list(batch.values())
+    session.execute(_upsert_statement(), rows)
+    if lesson_id is not None:
+        word_ids = session.execute(select(Word.id).where(Word.term.in_(batch))).scalars()
+        links = [{'lesson_id': lesson_id, 'word_id': word_id} for word_id in word_ids]
+        session.execute(insert(lesson_words).on_conflict_do_nothing(), links)
+    session.commit()
+    return len(rows)
+
+def import_words(session, path, fmt=None, lesson_id=None, batch_size=MAX_BATCH):
+    """
+    Upsert words from a CSV, TSV or JSONL file in batches of batch_size (at most MAX_BATCH),
+    optionally linking each one to lesson_id. Existing terms get the new translation.
+    """
+    if lesson_id is not None and session.get(Lesson, lesson_id) is None:
+        raise ValueError(f"Lesson {lesson_id} does not exist")
+    batch_size = max(1, min(batch_size, MAX_BATCH))
+    report = ImportReport()
+    start = time.perf_counter()
+    batch = {}  # term -> row; a repeated term within a batch keeps the last row
+    for line_no, record in iter_records(path, fmt):
+        row, reason = clean_record(record)
+        if reason:
+            report.rejected.append((line_no, reason))
+            continue
+        if row['term'] in batch:
+            report.duplicates += 1
+        batch[row['term']] = row
+        if len(batch) >= batch_size:
+            report.imported += _flush(session, batch, lesson_id)
+            batch = {}
+    if batch:
+        report.imported += _flush(session, batch, lesson_id)
+    report.seconds = time.perf_counter() - start
+    return report
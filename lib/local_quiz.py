@@ -0,0 +1,101 @@
+# lib/local_quiz.py
+import heapq
+from datetime import datetime, timezone
+from sqlalchemy import select, and_
+from lib.config import getenv
+from lib.models import Word, ReviewState, lesson_words
+from lib.structures import WeightedSampler
+
+# Sampling weights. Due words come up most, lapsed ones more still; words whose next review
+# is still ahead come up rarely. Hard words (low ease) get a boost on top. The spread between
+# the smallest and largest weight stays bounded, which keeps WeightedSampler draws O(1).
+NEW_WEIGHT = 2.0
+DUE_WEIGHT = 4.0
+LAPSED_WEIGHT = 6.0  # answered wrong last time and due again
+RELEARNING_WEIGHT = 1.5  # answered wrong last time, not due yet
+SCHEDULED_WEIGHT = 0.5
+HARD_EASE = 2.0
+HARD_FACTOR = 1.5
+
+def _utc(value):
+    # SQLite hands datetimes back naive; they were written in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def word_weight(state, now):
+    """Sampling weight for a (due_date, repetitions, ease, last_reviewed) review state, or None for a new word."""
+    if state is None:
+        return NEW_WEIGHT
+    due_date, repetitions, ease, last_reviewed = state
+    lapsed = not repetitions and last_reviewed is not None
+    if due_date <= now:
+        weight = LAPSED_WEIGHT if lapsed else DUE_WEIGHT
+    else:
+        weight = RELEARNING_WEIGHT if lapsed else SCHEDULED_WEIGHT
+    if ease is not None and ease < HARD_EASE:
+        weight *= HARD_FACTOR
+    return weight
+
+def quiz_size():
+    return int(getenv('LINGUA_LOCAL_QUIZ_SIZE', 5))
+
+class LocalQuiz:
+    """
+    Quiz questions drawn from the Word table, weighted towards one learner's due and weak words.
+    The words are loaded once; after that only changes are applied: new words are picked up
+    by id, graded words are re-weighted by update(), and words whose review falls due are
+    promoted from a heap of upcoming due dates.
+    """
+
+    def __init__(self, learner_id, lesson_id=None, rng=None):
+        self.learner_id = learner_id
+        self.lesson_id = lesson_id
+        self.sampler = WeightedSampler(rng=rng)
+        self.cards = {}  # word_id -> (term, translation)
+        self._states = {}  # word_id -> review state tuple, for reviewed words
+        self._upcoming = []  # (due_date, word_id) for words not due yet; stale entries are skipped
+        self._last_word_id = 0
+
+    def _set(self, word_id, state, now):
+        if state is not None:
+            state = (_utc(state[0]),) + tuple(state[1:])
+            self._states[word_id] = state
+            if state[0] > now:
+                heapq.heappush(self._upcoming, (state[0], word_id))
+        self.sampler.set(word_id, word_weight(state, now))
+
+    def sync(self, session, now=None):
+        """Load words added since the last sync and re-weight reviews that have fallen due."""
+        now = now or datetime.now(timezone.utc)
+        rs = ReviewState
+        query = (
+            select(Word.id, Word.term, Word.translation, rs.due_date, rs.repetitions, rs.ease, rs.last_reviewed)
+            .outerjoin(rs, and_(rs.word_id == Word.id, rs.learner_id == self.learner_id))
+            .where(Word.id > self._last_word_id)
+        )
+        if self.lesson_id is not None:
+            query = query.join(lesson_words, lesson_words.c.word_id == Word.id).where(
+                lesson_words.c.lesson_id == self.lesson_id)
+        for word_id, term, translation, *state in session.execute(query):
+            self.cards[word_id] = (term, translation)
+            self._set(word_id, state if state[0] is not None else None, now)
+            self._last_word_id = max(self._last_word_id, word_id)
+        while self._upcoming and self._upcoming[0][0] <= now:
+            due_date, word_id = heapq.heappop(self._upcoming)
+            state = self._states.get(word_id)
+            if state is not None and state[0] == due_date:
+                self.sampler.set(word_id, word_weight(state, now))
+
+    def update(self, review_states, now=None):
+        """Re-weight words just graded, from the ReviewState rows Learner.grade_quiz_words returned."""
+        now = now or datetime.now(timezone.utc)
+        for state in review_states:
+            if state.word_id in self.cards:
+                self._set(state.word_id, (state.due_date, state.repetitions, state.ease, state.last_reviewed), now)
+
+    def questions(self, session, count=None, now=None):
+        """(question, answer) pairs for count different words, in the format the AI quizzes use."""
+        self.sync(session, now)
+        return [(f"What is '{self.cards[word_id][0]}' in English?", self.cards[word_id][1])
+                for word_id in self.sampler.sample_distinct(count or quiz_size())]
@@ -1,22 +1,95 @@
 # lib/models.py
-import os
-from datetime import datetime, timezone
-from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, DateTime, Table, event
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, Column, Integer, Float, String, ForeignKey, DateTime, Table, Index, DDL, event, func, insert, select, update, delete, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, relationship, declarative_base
 from sqlalchemy.exc import IntegrityError
 
-load_dotenv()
+from lib.config import getenv
+
 Base = declarative_base()
-engine = create_engine(os.getenv('DATABASE_URL', 'sqlite:///lingua.db'))
-Session = sessionmaker(bind=engine)
+_engine = None
+
+# PRAGMAs applied to every new SQLite connection. 'default' leaves SQLite's own
+# settings alone (rollback journal, synchronous=FULL, no busy timeout).
+SQLITE_PROFILES = {
+    'default': {},
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # Safe with WAL; only the last commits can be lost on power failure
+        'busy_timeout': 5000,  # ms to wait on a locked database instead of failing
+        'cache_size': -64000,  # KiB, i.e. 64 MB
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    },
+}
+
+def sqlite_pragmas(profile):
+    pragmas = dict(SQLITE_PROFILES[profile])
+    # Individual settings can be overridden, e.g. LINGUA_SQLITE_SYNCHRONOUS=FULL
+    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size'):
+        value = getenv(f'LINGUA_SQLITE_{name.upper()}')
+        if value:
+            pragmas[name] = value
+    return pragmas
+
+def make_engine(url, profile='wal'):
+    """Engine for url; SQLite URLs get the PRAGMAs of the named profile and a thread-safe pool."""
+    if not url.startswith('sqlite'):
+        return create_engine(url)
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}; choose from {', '.join(SQLITE_PROFILES)}")
+    pragmas = sqlite_pragmas(profile)
+    options = {'connect_args': {'check_same_thread': False}}
+    if ':memory:' in url or url.rstrip('/') == 'sqlite:':
+        from sqlalchemy.pool import StaticPool
+        options['poolclass'] = StaticPool  # One shared connection, or each thread sees its own empty database
+    else:
+        options.update(pool_size=int(getenv('LINGUA_DB_POOL_SIZE', 5)), max_overflow=10, pool_timeout=30)
+        if 'busy_timeout' in pragmas:
+            options['connect_args']['timeout'] = int(pragmas['busy_timeout']) / 1000
+    engine = create_engine(url, **options)
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+def get_engine():
+    """Create the engine on first use instead of at import time."""
+    global _engine
+    if _engine is None:
+        _engine = make_engine(getenv('DATABASE_URL', 'sqlite:///lingua.db'), getenv('LINGUA_DB_PROFILE', 'wal'))
+    return _engine
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to get_engine() when the first session is opened."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get('bind') is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+Session = _LazySessionmaker()
+
+def __getattr__(name):
+    # Keeps `from lib.models import engine` working without building it at import
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Join table for many-to-many between Lesson and Word
 lesson_words = Table(
     'lesson_words',
     Base.metadata,
     Column('lesson_id', Integer, ForeignKey('lessons.id'), primary_key=True),
-    Column('word_id', Integer, ForeignKey('words.id'), primary_key=True)
+    Column('word_id', Integer, ForeignKey('words.id'), primary_key=True),
+    # The primary key leads with lesson_id; joins coming from a word need their own index
+    Index('ix_lesson_words_word', 'word_id'),
 )
 
 class Learner(Base):
@@ -28,6 +101,7 @@ class Learner(Base):
     proficiency_level = Column(String, default='Beginner')
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     sessions = relationship('PracticeSession', back_populates='learner')
+    stats = relationship('LearnerStats', back_populates='learner', uselist=False, cascade='all, delete-orphan')
     total_learners = 0
 
     def __init__(self, *args, **kwargs):
@@ -38,40 +112,70 @@ class Learner(Base):
         self.grammar_tree = GrammarTree()
 
     def add_session(self, session, score, lesson_id=None, feedback=""):
-        new_session = PracticeSession(learner_id=self.id, lesson_id=lesson_id, score=score, feedback=feedback)
+        # Session row, stats and level change are written in one transaction
+        new_session = PracticeSession(learner_id=self.id, lesson_id=lesson_id, score=score, feedback=feedback,
+                                      session_date=datetime.now(timezone.utc))
         session.add(new_session)
+        self.stats = LearnerStats.record(session, self.id, score, new_session.session_date)
+        # Level from the row just written, in SQL, so a stale in-memory level cannot mask the update
+        Learner.refresh_levels(session, [self.id])
+        session.expire(self, ['proficiency_level'])
         session.commit()
-        self.update_level(session)
+        return new_session
 
     def update_level(self, session):
-        avg_score = self.get_average_score(session)
+        self._apply_level()
+        session.commit()
+
+    def _apply_level(self):
+        avg_score = self.get_average_score()
         if avg_score > 90:
             self.proficiency_level = 'Advanced'
         elif avg_score > 70:
             self.proficiency_level = 'Intermediate'
         else:
             self.proficiency_level = 'Beginner'
-        session.commit()
 
-    def get_average_score(self, session):
-        total_sessions = len(self.sessions)
-        if total_sessions == 0:
-            return 0
-        return sum(s.score for s in self.sessions) / total_sessions
+    @property
+    def session_count(self):
+        return self.stats.session_count if self.stats else 0
+
+    def get_average_score(self, session=None):
+        # Reads the materialized LearnerStats row instead of scanning sessions
+        return self.stats.average_score if self.stats else 0
 
     @property
     def fluency_score(self):
-        if not self.sessions:
+        if not self.session_count:
             return 0
-        avg_score = sum(s.score for s in self.sessions) / len(self.sessions)
-        return avg_score * (len(self.sessions) / 10)
+        return self.get_average_score() * (self.session_count / 10)
+
+    @classmethod
+    def refresh_levels(cls, session, learner_ids=None):
+        """Set levels from learner_stats in one UPDATE, with the same thresholds as _apply_level. Does not commit."""
+        average = select(LearnerStats.score_total / LearnerStats.session_count).where(
+            LearnerStats.learner_id == cls.id).scalar_subquery()
+        statement = update(cls).values(proficiency_level=case(
+            (average > 90, 'Advanced'), (average > 70, 'Intermediate'), else_='Beginner'))
+        if learner_ids is not None:
+            statement = statement.where(cls.id.in_(learner_ids))
+        session.execute(statement, execution_options={'synchronize_session': False})
+
+    @classmethod
+    def find_by_name(cls, session, name):
+        """
+        Learner whose name matches case-insensitively, or None. Names differing only in case
+        may both exist, so an exact match wins, then the oldest. Not for authentication.
+        """
+        return (session.query(cls).filter(func.lower(cls.name) == func.lower(name))
+                .order_by(case((cls.name == name, 0), else_=1), cls.id).first())
 
     @classmethod
     def get_progress(cls, session, learner_id):
         learner = session.get(cls, learner_id)  # Updated to use session.get
         if not learner:
             return "Learner not found."
-        total_sessions = len(learner.sessions)
+        total_sessions = learner.session_count
         avg_score = learner.get_average_score(session)
         return f"Progress for {learner.name}: {total_sessions} sessions, average score: {avg_score:.2f}, fluency score: {learner.fluency_score:.2f}"
 
@@ -82,29 +186,81 @@ class Learner(Base):
         self.repetition_list.add(word)
 
     def review_weak_words(self):
-        self.repetition_list.sort()
+        # Kept in load order: due words most overdue first, then low-score lesson words
         return self.repetition_list
 
     def load_weak_words(self, session):
-        low_sessions = [s for s in self.sessions if s.score < 70]
-        for s in low_sessions:
-            if s.lesson:
-                for word in s.lesson.words:
-                    self.add_weak_word(word.term)
+        # Scheduled reviews that are due come first, most overdue at the head
+        for term in self.due_words(session):
+            self.add_weak_word(term)
+        for (term,) in self.practiced_words(session, max_score=70).with_entities(Word.term):
+            self.add_weak_word(term)
+
+    def practiced_words(self, session, max_score=None, after_session_id=None, through_session_id=None):
+        """
+        Distinct words from lessons this learner has practised, as one JOIN query.
+        The session id bounds restrict it to sessions in (after_session_id, through_session_id].
+        """
+        query = (
+            session.query(Word)
+            .join(lesson_words, lesson_words.c.word_id == Word.id)
+            .join(PracticeSession, PracticeSession.lesson_id == lesson_words.c.lesson_id)
+            .filter(PracticeSession.learner_id == self.id)
+            .distinct()
+        )
+        if max_score is not None:
+            query = query.filter(PracticeSession.score < max_score)
+        if after_session_id is not None:
+            query = query.filter(PracticeSession.id > after_session_id)
+        if through_session_id is not None:
+            query = query.filter(PracticeSession.id <= through_session_id)
+        return query
+
+    def schedule_review(self, session, word, quality, now=None):
+        """Grade one word (quality 0-5) and persist its next due date. Does not commit."""
+        state = session.get(ReviewState, (self.id, word.id))
+        if state is None:
+            state = ReviewState(learner_id=self.id, word_id=word.id)
+            session.add(state)
+        state.grade(quality, now)
+        return state
+
+    def grade_quiz_words(self, session, graded, now=None):
+        """Schedule reviews for (term, quality) pairs; terms not in the Word table are skipped."""
+        qualities = {term: quality for term, quality in graded if term}
+        if not qualities:
+            return []
+        words = session.query(Word).filter(Word.term.in_(qualities)).all()
+        return [self.schedule_review(session, word, qualities[word.term], now) for word in words]
+
+    def due_words(self, session, now=None, limit=None):
+        """Terms due for review, most overdue first, read from the (learner_id, due_date) index."""
+        now = now or datetime.now(timezone.utc)
+        query = (
+            session.query(Word.term)
+            .join(ReviewState, ReviewState.word_id == Word.id)
+            .filter(ReviewState.learner_id == self.id, ReviewState.due_date <= now)
+            .order_by(ReviewState.due_date)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [term for (term,) in query]
 
     def add_grammar_rule(self, rule):
         self.grammar_tree.insert(rule)
 
-    def practice_grammar(self):
+    def load_grammar_rules(self, rules):
+        from lib.structures import GrammarTree
+        self.grammar_tree = GrammarTree.from_sorted(sorted(rules))
+
+    def practice_grammar(self, topic=None):
+        if topic:
+            return list(self.grammar_tree.prefix(topic))
         return self.grammar_tree.traverse_in_order(self.grammar_tree.root)
 
     def generate_quiz_prompt(self):
-        if self.proficiency_level == 'Beginner':
-            return f"Create a simple quiz for beginner {self.target_language} learner on basic vocabulary."
-        elif self.proficiency_level == 'Intermediate':
-            return f"Create an intermediate quiz for {self.proficiency_level} {self.target_language} learner on grammar and vocabulary."
-        else:
-            return f"Create an advanced quiz for {self.proficiency_level} {self.target_language} learner on conversation and grammar."
+        from lib.helpers import quiz_prompt
+        return quiz_prompt(self.target_language, self.proficiency_level)
 
 class Word(Base):
     __tablename__ = 'words'
@@ -115,6 +271,12 @@ class Word(Base):
     example_sentence = Column(String)
     lessons = relationship('Lesson', secondary=lesson_words, back_populates='words')
 
+    @classmethod
+    def find_by_term(cls, session, term):
+        """Word whose term matches case-insensitively, or None; an exact match wins, as in find_by_name."""
+        return (session.query(cls).filter(func.lower(cls.term) == func.lower(term))
+                .order_by(case((cls.term == term, 0), else_=1), cls.id).first())
+
     def __repr__(self):
         return f"<Word(term={self.term}, translation={self.translation})>"
 
@@ -141,9 +303,170 @@ class PracticeSession(Base):
     learner = relationship('Learner', back_populates='sessions')
     lesson = relationship('Lesson', back_populates='sessions')
 
+    __table_args__ = (
+        Index('ix_practice_sessions_learner_date', 'learner_id', 'session_date'),
+        Index('ix_practice_sessions_learner_lesson', 'learner_id', 'lesson_id', 'score'),
+    )
+
     def __repr__(self):
         return f"<PracticeSession(learner_id={self.learner_id}, date={self.session_date}, score={self.score})>"
 
+# Case-insensitive lookups (find_by_name / find_by_term) compare lower() on both sides
+Index('ix_learners_name_lower', func.lower(Learner.name))
+Index('ix_words_term_lower', func.lower(Word.term))
+
+# Full-text index over words for lib.search. It is an external-content FTS5 table, so it
+# stores only the index; the triggers keep it in step with every insert, upsert and delete.
+# remove_diacritics folds accents, and the prefix indexes keep short prefix queries fast.
+WORDS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE words_fts USING fts5(term, translation, example_sentence, content='words', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    # Rank the term column above the translation, and both above example sentences
+    "INSERT INTO words_fts(words_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+    "CREATE TRIGGER words_fts_insert AFTER INSERT ON words BEGIN "
+    "INSERT INTO words_fts(rowid, term, translation, example_sentence) "
+    "VALUES (new.id, new.term, new.translation, new.example_sentence); END",
+    "CREATE TRIGGER words_fts_delete AFTER DELETE ON words BEGIN "
+    "INSERT INTO words_fts(words_fts, rowid, term, translation, example_sentence) "
+    "VALUES ('delete', old.id, old.term, old.translation, old.example_sentence); END",
+    "CREATE TRIGGER words_fts_update AFTER UPDATE ON words BEGIN "
+    "INSERT INTO words_fts(words_fts, rowid, term, translation, example_sentence) "
+    "VALUES ('delete', old.id, old.term, old.translation, old.example_sentence); "
+    "INSERT INTO words_fts(rowid, term, translation, example_sentence) "
+    "VALUES (new.id, new.term, new.translation, new.example_sentence); END",
+)
+for statement in WORDS_FTS_DDL:
+    event.listen(Word.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Word.__table__, 'before_drop', DDL("DROP TABLE IF EXISTS words_fts").execute_if(dialect='sqlite'))
+
+class LearnerStats(Base):
+    """Running per-learner totals, kept in step with practice_sessions by Learner.add_session."""
+    __tablename__ = 'learner_stats'
+    learner_id = Column(Integer, ForeignKey('learners.id'), primary_key=True)
+    session_count = Column(Integer, nullable=False, default=0)
+    score_total = Column(Float, nullable=False, default=0)
+    last_session_date = Column(DateTime)
+    learner = relationship('Learner', back_populates='stats')
+
+    @property
+    def average_score(self):
+        if not self.session_count:
+            return 0
+        return self.score_total / self.session_count
+
+    @classmethod
+    def upsert(cls):
+        """INSERT ... ON CONFLICT that adds session_count and score_total to the stored totals in one statement."""
+        stmt = sqlite_insert(cls.__table__)
+        table = cls.__table__.c
+        return stmt.on_conflict_do_update(
+            index_elements=['learner_id'],
+            set_={
+                'session_count': table.session_count + stmt.excluded.session_count,
+                'score_total': table.score_total + stmt.excluded.score_total,
+                'last_session_date': func.max(func.coalesce(table.last_session_date, stmt.excluded.last_session_date),
+                                              stmt.excluded.last_session_date),
+            },
+        )
+
+    @classmethod
+    def record(cls, session, learner_id, score, session_date):
+        """
+        Add one session to a learner's totals and return the updated row. The increment happens
+        in SQL, so concurrent writers cannot lose each other's sessions. Does not commit.
+        """
+        session.execute(cls.upsert(), {'learner_id': learner_id, 'session_count': 1,
+                                       'score_total': score or 0, 'last_session_date': session_date})
+        return session.get(cls, learner_id, populate_existing=True)
+
+    @classmethod
+    def rebuild(cls, session, learner_id=None):
+        """Recompute stats from practice_sessions with one aggregate query. Returns rows written."""
+        totals = select(
+            PracticeSession.learner_id,
+            func.count(PracticeSession.id),
+            func.coalesce(func.sum(PracticeSession.score), 0),
+            func.max(PracticeSession.session_date),
+        ).group_by(PracticeSession.learner_id)
+        clear = delete(cls)
+        if learner_id is not None:
+            totals = totals.where(PracticeSession.learner_id == learner_id)
+            clear = clear.where(cls.learner_id == learner_id)
+        session.execute(clear)
+        result = session.execute(
+            insert(cls).from_select(['learner_id', 'session_count', 'score_total', 'last_session_date'], totals)
+        )
+        session.commit()
+        session.expire_all()
+        return result.rowcount
+
+    def __repr__(self):
+        return f"<LearnerStats(learner_id={self.learner_id}, sessions={self.session_count}, total={self.score_total})>"
+
+class ReviewState(Base):
+    """SM-2 spaced-repetition state for one learner and word."""
+    __tablename__ = 'review_states'
+    learner_id = Column(Integer, ForeignKey('learners.id'), primary_key=True)
+    word_id = Column(Integer, ForeignKey('words.id'), primary_key=True)
+    ease = Column(Float, nullable=False, default=2.5)
+    interval = Column(Integer, nullable=False, default=0)  # days
+    repetitions = Column(Integer, nullable=False, default=0)
+    due_date = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_reviewed = Column(DateTime)
+    word = relationship('Word')
+
+    __table_args__ = (Index('ix_review_states_learner_due', 'learner_id', 'due_date'),)
+
+    MIN_EASE = 1.3
+    PASS_QUALITY = 3
+    CORRECT = 5
+    WRONG = 1
+    MAX_INTERVAL = 36500  # days; without a cap a long run of correct answers overflows datetime
+
+    def grade(self, quality, now=None):
+        now = now or datetime.now(timezone.utc)
+        ease = self.ease if self.ease is not None else 2.5
+        repetitions = self.repetitions or 0
+        if quality >= self.PASS_QUALITY:
+            if repetitions == 0:
+                self.interval = 1
+            elif repetitions == 1:
+                self.interval = 6
+            else:
+                self.interval = min(self.MAX_INTERVAL, round((self.interval or 1) * ease))
+            self.repetitions = repetitions + 1
+        else:
+            # Lapsed: start the word over tomorrow
+            self.repetitions = 0
+            self.interval = 1
+        self.ease = max(self.MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.last_reviewed = now
+        self.due_date = now + timedelta(days=self.interval)
+
+    def __repr__(self):
+        return f"<ReviewState(learner_id={self.learner_id}, word_id={self.word_id}, due={self.due_date}, ease={self.ease:.2f})>"
+
+class ExportWatermark(Base):
+    """How far a learner's flashcards have been exported to a given sync target."""
+    __tablename__ = 'export_watermarks'
+    learner_id = Column(Integer, ForeignKey('learners.id'), primary_key=True)
+    target = Column(String, primary_key=True, default='default')
+    last_session_id = Column(Integer, nullable=False, default=0)
+    exported_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ExportWatermark(learner_id={self.learner_id}, target={self.target}, last_session_id={self.last_session_id})>"
+
+class ExportedWord(Base):
+    """A word already sent to a sync target; delta exports emit every practised word not listed here."""
+    __tablename__ = 'exported_words'
+    learner_id = Column(Integer, ForeignKey('learners.id'), primary_key=True)
+    target = Column(String, primary_key=True)
+    word_id = Column(Integer, ForeignKey('words.id'), primary_key=True)
+
+    def __repr__(self):
+        return f"<ExportedWord(learner_id={self.learner_id}, target={self.target}, word_id={self.word_id})>"
+
 @event.listens_for(Learner, 'load')
 def receive_load(target, context):
     from lib.structures import DoublyLinkedList, GrammarTree
@@ -0,0 +1,117 @@
+# lib/prefetch.py
+import threading
+import time
+from collections import OrderedDict, deque
+from lib.config import getenv
+
+class QuizPrefetchPool:
+    """
+    Bounded pool of ready-made quizzes keyed by (language, proficiency_level).
+    Quizzes are generated in the background and expire after max_age seconds.
+    """
+
+    def __init__(self, generator, per_key=2, max_keys=16, max_age=600, submit=None):
+        self._generator = generator
+        self._submit = submit
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self.max_age = max_age
+        self._ready = OrderedDict()  # key -> deque of (created_at, quiz), least recently used first
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.prefetched = 0
+
+    def prefetch(self, target_language, proficiency_level):
+        """Queue a background generation unless this key is already full. Returns the Future or None."""
+        key = (target_language, proficiency_level)
+        with self._lock:
+            self._purge(key, time.monotonic())
+            queued = len(self._ready.get(key, ())) + self._pending.get(key, 0)
+            if queued >= self.per_key:
+                return None
+            self._pending[key] = self._pending.get(key, 0) + 1
+        submit = self._submit
+        if submit is None:
+            from lib.helpers import get_executor
+            submit = get_executor().submit
+        return submit(self._fill, key)
+
+    def _fill(self, key):
+        try:
+            quiz = self._generator(*key)
+        finally:
+            with self._lock:
+                self._pending[key] -= 1
+                if not self._pending[key]:
+                    del self._pending[key]
+        if not quiz:
+            return None
+        with self._lock:
+            queue = self._ready.setdefault(key, deque(maxlen=self.per_key))
+            queue.append((time.monotonic(), quiz))
+            self._ready.move_to_end(key)
+            while len(self._ready) > self.max_keys:
+                self._ready.popitem(last=False)
+            self.prefetched += 1
+        return quiz
+
+    def _purge(self, key, now):
+        queue = self._ready.get(key)
+        while queue and now - queue[0][0] > self.max_age:
+            queue.popleft()
+            self.expired += 1
+
+    def take(self, target_language, proficiency_level):
+        """Pop a fresh quiz for this key, or None so the caller can generate one synchronously."""
+        key = (target_language, proficiency_level)
+        with self._lock:
+            self._purge(key, time.monotonic())
+            queue = self._ready.get(key)
+            if queue:
+                self.hits += 1
+                self._ready.move_to_end(key)
+                return queue.popleft()[1]
+            self.misses += 1
+            return None
+
+    def metrics(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'expired': self.expired,
+                'prefetched': self.prefetched,
+                'ready': sum(len(queue) for queue in self._ready.values()),
+                'pending': sum(self._pending.values()),
+            }
+
+_pool = None
+
+def get_quiz_pool():
+    global _pool
+    if _pool is None:
+        # AI quizzes only: a failed call pools nothing, so the caller's own fallback runs instead
+        from lib.helpers import ai_quiz_for
+        _pool = QuizPrefetchPool(
+            ai_quiz_for,
+            per_key=int(getenv('LINGUA_PREFETCH_PER_KEY', 2)),
+            max_keys=int(getenv('LINGUA_PREFETCH_MAX_KEYS', 16)),
+            max_age=float(getenv('LINGUA_PREFETCH_MAX_AGE', 600)),
+        )
+    return _pool
+
+def prefetch_quiz(target_language, proficiency_level):
+    # Fallback quizzes are static and instant, so only prefetch when the API is in use
+    if not getenv('OPENAI_API_KEY'):
+        return None
+    return get_quiz_pool().prefetch(target_language, proficiency_level)
+
+def take_quiz(target_language, proficiency_level):
+    if _pool is None:
+        return None
+    return _pool.take(target_language, proficiency_level)
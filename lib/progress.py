@@ -0,0 +1,71 @@
+# lib/progress.py
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, tuple_
+from lib.models import PracticeSession
+
+class HistoryPage:
+    """One page of practice history, newest first, with the cursor for the next page."""
+
+    def __init__(self, rows, next_cursor):
+        self.rows = rows
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+def history_page(session, learner_id, before=None, page_size=20, window=10):
+    """
+    Sessions older than the session id `before` (newest first when None), each with the
+    average of its last `window` scores and the change from the previous session.
+    Only the page plus the window-1 sessions behind it are read, never the full history.
+    """
+    if window < 1 or page_size < 1:
+        raise ValueError("window and page_size must be at least 1")
+    ps = PracticeSession
+    query = select(ps.id, ps.session_date, ps.score, ps.lesson_id).where(ps.learner_id == learner_id)
+    if before is not None:
+        cursor = select(ps.session_date, ps.id).where(ps.id == before).subquery()
+        query = query.where(tuple_(ps.session_date, ps.id) < tuple_(cursor.c.session_date, cursor.c.id))
+    # Older rows feed the rolling windows of the page's last rows; one more tells whether a next page exists
+    lookback = max(window - 1, 1)
+    recent = query.order_by(ps.session_date.desc(), ps.id.desc()).limit(page_size + lookback).subquery()
+
+    chronological = (recent.c.session_date, recent.c.id)
+    rows = session.execute(
+        select(
+            recent.c.id,
+            recent.c.session_date,
+            recent.c.score,
+            recent.c.lesson_id,
+            func.avg(recent.c.score).over(order_by=chronological, rows=(-(window - 1), 0)).label('rolling_avg'),
+            (recent.c.score - func.lag(recent.c.score).over(order_by=chronological)).label('change'),
+            func.count().over().label('fetched'),
+        ).order_by(recent.c.session_date.desc(), recent.c.id.desc()).limit(page_size)
+    ).all()
+    has_more = bool(rows) and rows[0].fetched > page_size
+    return HistoryPage(rows, rows[-1].id if has_more else None)
+
+def weekly_summary(session, learner_id, weeks=12, now=None):
+    """Per-week session count, average, best and worst score, and change in average from the week before."""
+    ps = PracticeSession
+    now = now or datetime.now(timezone.utc)
+    # Start on a Monday so the first week is complete
+    start = (now - timedelta(weeks=weeks - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    start -= timedelta(days=start.weekday())
+    # Monday of each session's week
+    week = func.date(ps.session_date, 'weekday 0', '-6 days')
+    average = func.avg(ps.score)
+    return session.execute(
+        select(
+            week.label('week'),
+            func.count(ps.id).label('sessions'),
+            average.label('average'),
+            func.min(ps.score).label('worst'),
+            func.max(ps.score).label('best'),
+            (average - func.lag(average).over(order_by=week)).label('change'),
+        )
+        .where(ps.learner_id == learner_id, ps.session_date >= start)
+        .group_by(week)
+        .order_by(week)
+    ).all()
@@ -0,0 +1,42 @@
+# lib/search.py
+import re
+from sqlalchemy import text
+from lib.models import Word
+
+_TOKEN = re.compile(r'\w+')
+
+def match_expression(query, prefix=True):
+    """
+    FTS5 MATCH expression for free text: every word must match, quoted so user input
+    is never read as query syntax, and with prefix matching on each word when asked.
+    """
+    tokens = _TOKEN.findall(query)
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{token}"{suffix}' for token in tokens)
+
+def search_words(session, query, limit=20, prefix=True):
+    """
+    Words whose term, translation or example sentence match query, best first.
+    Matching ignores case and accents; ranking weighs term over translation over example,
+    and a word whose term is exactly the query always comes first.
+    """
+    expression = match_expression(query, prefix)
+    if not expression:
+        return []
+    # Every match is ranked, so the best ones are found wherever they sit in the index
+    ids = [row[0] for row in session.execute(
+        text("SELECT rowid FROM words_fts WHERE words_fts MATCH :expression ORDER BY rank LIMIT :limit"),
+        {'expression': expression, 'limit': limit},
+    )]
+    exact = Word.find_by_term(session, query.strip())
+    if exact is not None:
+        ids = [exact.id] + [word_id for word_id in ids if word_id != exact.id][:limit - 1]
+    if not ids:
+        return []
+    words = {word.id: word for word in session.query(Word).filter(Word.id.in_(ids))}
+    return [words[word_id] for word_id in ids if word_id in words]
+
+def rebuild_index(session):
+    """Re-index every word, e.g. after rows were written with the triggers missing."""
+    session.execute(text("INSERT INTO words_fts(words_fts) VALUES ('rebuild')"))
+    session.commit()
@@ -3,22 +3,41 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import argparse
+import random
+import time
+from sqlalchemy import insert
 from sqlalchemy.exc import IntegrityError
-from lib.models import Session, Learner, Word, Lesson, PracticeSession
-from datetime import datetime
+from lib.models import (Session, Learner, Word, Lesson, PracticeSession, LearnerStats, ReviewState,
+                        ExportWatermark, ExportedWord, lesson_words)
+from datetime import datetime, timedelta, timezone
+
+LANGUAGES = (("Spanish", 50), ("French", 25), ("German", 15), ("Italian", 10))
+PARTS_OF_SPEECH = (("noun", 45), ("verb", 25), ("adjective", 15), ("adverb", 8), ("interjection", 7))
+# Two-letter syllables keep generated terms pronounceable and unambiguous to split
+SYLLABLES = [c + v for c in "bcdfglmnprstvz" for v in "aeiou"]
+
+def clear_data(session):
+    """Delete every row the app owns, children first."""
+    try:
+        session.query(PracticeSession).delete()
+        session.query(LearnerStats).delete()
+        session.query(ReviewState).delete()
+        session.query(ExportedWord).delete()
+        session.query(ExportWatermark).delete()
+        session.execute(lesson_words.delete())
+        session.query(Learner).delete()
+        session.query(Word).delete()
+        session.query(Lesson).delete()
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        print("Rollback occurred during cleanup.")
 
 def seed_data():
     with Session() as session:
-        try:
-            # Clear existing data (for reseeding)
-            session.query(PracticeSession).delete()
-            session.query(Learner).delete()
-            session.query(Word).delete()
-            session.query(Lesson).delete()
-            session.commit()
-        except IntegrityError:
-            session.rollback()
-            print("Rollback occurred during cleanup.")
+        # Clear existing data (for reseeding)
+        clear_data(session)
 
         # Sample Learners (use base class, add passwords)
         learner1 = Learner(name="Alice", password="alicepass", target_language="Spanish", proficiency_level="Beginner")
@@ -40,9 +59,7 @@ def seed_data():
         session.commit()
 
         # Sample Practice Session
-        session1 = PracticeSession(learner_id=learner1.id, lesson_id=lesson1.id, score=85, feedback="Good start!")
-        session.add(session1)
-        session.commit()
+        learner1.add_session(session, score=85, lesson_id=lesson1.id, feedback="Good start!")
 
         # Test OOP methods
         print(f"Total learners: {Learner.total_learners}")
@@ -56,5 +73,126 @@ def seed_data():
 
         print("Database seeded successfully!")
 
+def pseudo_word(n):
+    """Unique pronounceable term for n >= 0 (bijective base-len(SYLLABLES), at least two syllables)."""
+    n += len(SYLLABLES) + 1
+    parts = []
+    while n:
+        n, digit = divmod(n - 1, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return "".join(reversed(parts))
+
+def _weighted(rng, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+def _insert_chunks(session, table, rows, chunk_size):
+    """executemany Core INSERTs in chunks so generated rows never sit in memory all at once."""
+    chunk, total = [], 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            session.execute(insert(table), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        session.execute(insert(table), chunk)
+        total += len(chunk)
+    session.commit()
+    return total
+
+def generate_data(session, learners=100, words=2000, sessions=20000, lessons=None, words_per_lesson=20,
+                  days=365, seed=0, chunk_size=10000, now=None):
+    """
+    Replace the database contents with a synthetic, reproducible data set for load testing.
+    Returns a dict of row counts per table.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    lessons = lessons or max(1, words // words_per_lesson)
+    clear_data(session)
+    counts = {}
+
+    # Each learner gets a fixed ability; a handful are far more active than the rest
+    abilities = [min(98.0, max(25.0, rng.gauss(68, 12))) for _ in range(learners)]
+    activity = [1 / (rank + 1) ** 0.8 for rank in range(learners)]
+    rng.shuffle(activity)
+    counts['learners'] = _insert_chunks(session, Learner.__table__, (
+        {'id': i + 1, 'name': f"learner{i + 1:07d}", 'password': f"pass{i + 1}",
+         'target_language': _weighted(rng, LANGUAGES), 'proficiency_level': 'Beginner',
+         'created_at': now - timedelta(days=days + rng.randrange(30))}
+        for i in range(learners)), chunk_size)
+
+    counts['words'] = _insert_chunks(session, Word.__table__, (
+        {'id': i + 1, 'term': pseudo_word(i), 'translation': f"gloss {i + 1}",
+         'part_of_speech': _weighted(rng, PARTS_OF_SPEECH),
+         'example_sentence': f"{pseudo_word(i).capitalize()} {pseudo_word(rng.randrange(words))}." if rng.random() < 0.6 else None}
+        for i in range(words)), chunk_size)
+
+    # Lessons walk the vocabulary in order and recycle a few earlier words for review
+    difficulties = [1 + (3 * k) // lessons for k in range(lessons)]
+    counts['lessons'] = _insert_chunks(session, Lesson.__table__, (
+        {'id': k + 1, 'title': f"Lesson {k + 1}", 'description': f"Synthetic lesson {k + 1}", 'difficulty': difficulties[k]}
+        for k in range(lessons)), chunk_size)
+
+    def lesson_links():
+        for k in range(lessons):
+            start = (k * words_per_lesson) % words
+            members = {(start + j) % words + 1 for j in range(min(words_per_lesson, words))}
+            if start:
+                members.update(rng.randint(1, start) for _ in range(words_per_lesson // 5))
+            for word_id in sorted(members):
+                yield {'lesson_id': k + 1, 'word_id': word_id}
+    counts['lesson_words'] = _insert_chunks(session, lesson_words, lesson_links(), chunk_size)
+
+    # Scores centre on the learner's ability, drop on harder lessons and improve with time
+    span = days * 86400
+    cum_activity = []
+    running = 0.0
+    for weight in activity:
+        running += weight
+        cum_activity.append(running)
+
+    def practice_rows():
+        for _ in range(sessions):
+            learner = rng.choices(range(learners), cum_weights=cum_activity)[0]
+            lesson = rng.randrange(lessons)
+            offset = rng.randrange(span)
+            progress = offset / span
+            score = rng.gauss(abilities[learner] - 5 * (difficulties[lesson] - 1) + 8 * progress - 4, 10)
+            yield {'learner_id': learner + 1, 'lesson_id': lesson + 1,
+                   'session_date': now - timedelta(seconds=span - offset),
+                   'score': int(min(100, max(0, round(score)))), 'feedback': ""}
+    counts['practice_sessions'] = _insert_chunks(session, PracticeSession.__table__, practice_rows(), chunk_size)
+
+    LearnerStats.rebuild(session)
+    Learner.refresh_levels(session)
+    session.commit()
+    return counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the database. With any size option, generate a synthetic data set instead of the samples.")
+    parser.add_argument('--learners', type=int)
+    parser.add_argument('--words', type=int)
+    parser.add_argument('--sessions', type=int)
+    parser.add_argument('--lessons', type=int, help="Default: one per --words-per-lesson words.")
+    parser.add_argument('--words-per-lesson', type=int, default=20)
+    parser.add_argument('--days', type=int, default=365, help="How far back practice sessions go.")
+    parser.add_argument('--seed', type=int, default=0, help="Same seed and sizes give the same data.")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Rows per INSERT batch.")
+    args = parser.parse_args(argv)
+    if args.learners is None and args.words is None and args.sessions is None:
+        seed_data()
+        return
+    started = time.perf_counter()
+    with Session() as session:
+        counts = generate_data(session, learners=args.learners or 100, words=args.words or 2000,
+                               sessions=args.sessions if args.sessions is not None else 20000,
+                               lessons=args.lessons, words_per_lesson=args.words_per_lesson, days=args.days,
+                               seed=args.seed, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"Generated in {elapsed:.1f}s")
+
 if __name__ == "__main__":
-    seed_data()
\ No newline at end of file
+    main()
\ No newline at end of file
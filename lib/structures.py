@@ -1,5 +1,9 @@
 # lib/structures.py
+import random
+
 class Node:
+    __slots__ = ('data', 'prev', 'next')
+
     def __init__(self, data):
         self.data = data
         self.prev = None
@@ -9,83 +13,376 @@ class DoublyLinkedList:
     def __init__(self):
         self.head = None
         self.tail = None
+        self._index = {}  # data -> Node, so lookups never walk the list
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        current = self.head
+        while current:
+            yield current.data
+            current = current.next
 
     def add(self, data):
+        # Duplicates are ignored; the existing node keeps its position
+        node = self._index.get(data)
+        if node is not None:
+            return node
         node = Node(data)
+        self._index[data] = node
         if not self.head:
             self.head = self.tail = node
         else:
             node.prev = self.tail
             self.tail.next = node
             self.tail = node
+        return node
 
-    def move_to_end(self, node):
-        if node == self.tail:
-            return
+    def remove(self, key):
+        node = self._index.pop(key, None)
+        if node is None:
+            return None
+        self._unlink(node)
+        return node
+
+    def _unlink(self, node):
         if node.prev:
             node.prev.next = node.next
+        else:
+            self.head = node.next
         if node.next:
             node.next.prev = node.prev
-        if node == self.head:
-            self.head = node.next
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+
+    def move_to_end(self, node):
+        if not isinstance(node, Node):
+            node = self._index.get(node)
+            if node is None:
+                return
+        if node == self.tail:
+            return
+        self._unlink(node)
         node.prev = self.tail
-        node.next = None
         self.tail.next = node
         self.tail = node
 
     def search(self, key):
-        current = self.head
-        while current:
-            if current.data == key:
-                return current
-            current = current.next
-        return None
+        return self._index.get(key)
 
-    def sort(self):
-        # Simple bubble sort for demonstration (assumes comparable data like strings)
+    def sort(self, key=None):
+        """Stable natural merge sort that relinks the existing nodes, O(n log n)."""
+        if self.head is None or self.head.next is None:
+            return
+        # Split into ascending runs, each a singly linked chain terminated by None
+        runs = []
+        start = current = self.head
+        while current.next:
+            nxt = current.next
+            a = current.data if key is None else key(current.data)
+            b = nxt.data if key is None else key(nxt.data)
+            if b < a:
+                current.next = None
+                runs.append(start)
+                start = nxt
+            current = nxt
+        runs.append(start)
+        # Merge neighbouring runs pairwise until one remains
+        while len(runs) > 1:
+            merged = []
+            for i in range(0, len(runs) - 1, 2):
+                merged.append(self._merge(runs[i], runs[i + 1], key))
+            if len(runs) % 2:
+                merged.append(runs[-1])
+            runs = merged
+        # Restore prev pointers and tail in one pass
+        self.head = runs[0]
+        prev = None
         current = self.head
         while current:
-            next_node = current.next
-            while next_node:
-                if current.data > next_node.data:
-                    current.data, next_node.data = next_node.data, current.data
-                next_node = next_node.next
+            current.prev = prev
+            prev = current
             current = current.next
+        self.tail = prev
+
+    @staticmethod
+    def _merge(left, right, key):
+        dummy = tail = Node(None)
+        if key is None:
+            while left and right:
+                # "<=" keeps equal items in their original order
+                if left.data <= right.data:
+                    tail.next = left
+                    left = left.next
+                else:
+                    tail.next = right
+                    right = right.next
+                tail = tail.next
+        else:
+            left_key = key(left.data)
+            right_key = key(right.data)
+            while True:
+                if left_key <= right_key:
+                    tail.next = left
+                    tail = left
+                    left = left.next
+                    if left is None:
+                        break
+                    left_key = key(left.data)
+                else:
+                    tail.next = right
+                    tail = right
+                    right = right.next
+                    if right is None:
+                        break
+                    right_key = key(right.data)
+        tail.next = left or right
+        return dummy.next
 
 class TreeNode:
+    __slots__ = ('data', 'left', 'right', 'height')
+
     def __init__(self, data):
         self.data = data
         self.left = None
         self.right = None
+        self.height = 1
 
 class GrammarTree:
+    """AVL tree of grammar rules; equal rules are kept and sit to the right of each other."""
+
     def __init__(self):
         self.root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return self.iter_in_order()
+
+    @classmethod
+    def from_sorted(cls, items):
+        """Build a balanced tree from already sorted items in O(n)."""
+        items = list(items)
+        for i in range(1, len(items)):
+            if items[i] < items[i - 1]:
+                raise ValueError("from_sorted requires items in ascending order")
+        tree = cls()
+        tree.root = cls._build(items, 0, len(items))
+        tree._size = len(items)
+        return tree
+
+    @classmethod
+    def _build(cls, items, lo, hi):
+        # Recursion depth is log2(n), so this is safe for any realistic size
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        node = TreeNode(items[mid])
+        node.left = cls._build(items, lo, mid)
+        node.right = cls._build(items, mid + 1, hi)
+        cls._update(node)
+        return node
 
     def insert(self, data):
+        node = TreeNode(data)
+        self._size += 1
         if not self.root:
-            self.root = TreeNode(data)
-            return
+            self.root = node
+            return node
+        path = []
         current = self.root
-        while True:
-            if data < current.data:
-                if current.left:
-                    current = current.left
-                else:
-                    current.left = TreeNode(data)
-                    break
+        while current:
+            path.append(current)
+            current = current.left if data < current.data else current.right
+        parent = path[-1]
+        if data < parent.data:
+            parent.left = node
+        else:
+            parent.right = node
+        # Walk back up, rebalancing and re-attaching each subtree root
+        for i in range(len(path) - 1, -1, -1):
+            current = path[i]
+            old_height = current.height
+            balanced = self._rebalance(current)
+            if i == 0:
+                self.root = balanced
+            elif path[i - 1].left is current:
+                path[i - 1].left = balanced
             else:
-                if current.right:
-                    current = current.right
-                else:
-                    current.right = TreeNode(data)
-                    break
+                path[i - 1].right = balanced
+            if balanced.height == old_height:
+                break  # Nothing above this subtree can have changed
+        return node
+
+    @staticmethod
+    def _height(node):
+        return node.height if node else 0
+
+    @classmethod
+    def _update(cls, node):
+        node.height = 1 + max(cls._height(node.left), cls._height(node.right))
+
+    @classmethod
+    def _rotate_left(cls, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        cls._update(node)
+        cls._update(pivot)
+        return pivot
+
+    @classmethod
+    def _rotate_right(cls, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        cls._update(node)
+        cls._update(pivot)
+        return pivot
+
+    @classmethod
+    def _rebalance(cls, node):
+        cls._update(node)
+        balance = cls._height(node.left) - cls._height(node.right)
+        if balance > 1:
+            if cls._height(node.left.left) < cls._height(node.left.right):
+                node.left = cls._rotate_left(node.left)
+            return cls._rotate_right(node)
+        if balance < -1:
+            if cls._height(node.right.right) < cls._height(node.right.left):
+                node.right = cls._rotate_right(node.right)
+            return cls._rotate_left(node)
+        return node
+
+    def iter_in_order(self, node=None):
+        """Lazily yield rules in order using an explicit stack instead of recursion."""
+        stack = []
+        current = self.root if node is None else node
+        while stack or current:
+            while current:
+                stack.append(current)
+                current = current.left
+            current = stack.pop()
+            yield current.data
+            current = current.right
 
     def traverse_in_order(self, node, result=None):
         if result is None:
             result = []
         if node:
-            self.traverse_in_order(node.left, result)
-            result.append(node.data)
-            self.traverse_in_order(node.right, result)
-        return result
\ No newline at end of file
+            result.extend(self.iter_in_order(node))
+        return result
+
+    def range(self, low=None, high=None):
+        """Yield rules with low <= rule < high in order; either bound may be None."""
+        stack = []
+        current = self.root
+        while stack or current:
+            while current:
+                if low is not None and current.data < low:
+                    # Everything on the left is smaller still
+                    current = current.right
+                else:
+                    stack.append(current)
+                    current = current.left
+            if not stack:
+                return
+            current = stack.pop()
+            if high is not None and not current.data < high:
+                return
+            yield current.data
+            current = current.right
+
+    def prefix(self, prefix):
+        """Yield rules starting with prefix, e.g. every rule for one topic."""
+        for rule in self.range(low=prefix):
+            if not rule.startswith(prefix):
+                return
+            yield rule
+
+class WeightedSampler:
+    """
+    Keys drawn with probability proportional to their weight. Keys sit in a flat array; a
+    draw picks a uniform slot and keeps it with probability weight / max weight, so set(),
+    remove() and sample() are all O(1), the last in expectation as long as the ratio between
+    the largest and the average weight stays bounded (callers clamp their weights).
+    """
+    # A run of rejections this long suggests the max-weight bound went stale after removals
+    STALE_BOUND_TRIES = 64
+
+    def __init__(self, weights=None, rng=None):
+        self._keys = []
+        self._weights = []
+        self._slots = {}  # key -> index into _keys/_weights
+        self._max = 0.0
+        self._random = rng or random.Random()
+        for key, weight in (weights or {}).items():
+            self.set(key, weight)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def weight(self, key):
+        return self._weights[self._slots[key]]
+
+    def set(self, key, weight):
+        """Add key or change its weight."""
+        if not weight > 0:
+            raise ValueError(f"Weight must be positive, got {weight!r}")
+        slot = self._slots.get(key)
+        if slot is None:
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            self._weights.append(weight)
+        else:
+            self._weights[slot] = weight
+        if weight > self._max:
+            self._max = weight
+
+    def remove(self, key):
+        # Fill the hole with the last key so the array stays dense
+        slot = self._slots.pop(key)
+        last_key = self._keys.pop()
+        last_weight = self._weights.pop()
+        if slot < len(self._keys):
+            self._keys[slot] = last_key
+            self._weights[slot] = last_weight
+            self._slots[last_key] = slot
+
+    def sample(self):
+        if not self._keys:
+            raise IndexError("sample from an empty WeightedSampler")
+        rand = self._random.random
+        count = len(self._keys)
+        tries = 0
+        while True:
+            slot = int(rand() * count)
+            if rand() * self._max < self._weights[slot]:
+                return self._keys[slot]
+            tries += 1
+            if tries == self.STALE_BOUND_TRIES:
+                self._max = max(self._weights)
+                tries = 0
+
+    def sample_distinct(self, k):
+        """Up to k different keys, each drawn from those not drawn yet, as dealing cards would."""
+        drawn = []
+        try:
+            for _ in range(min(k, len(self._keys))):
+                key = self.sample()
+                drawn.append((key, self.weight(key)))
+                self.remove(key)
+        finally:
+            for key, weight in drawn:
+                self.set(key, weight)
+        return [key for key, _ in drawn]
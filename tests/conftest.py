@@ -0,0 +1,42 @@
+# tests/conftest.py
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Run the suite against a throwaway database so the checked-in lingua.db is never touched.
+_db_dir = tempfile.mkdtemp(prefix='lingua_test_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['LINGUA_CACHE_PATH'] = os.path.join(_db_dir, 'cache.db')
+
+from lib.models import Base, get_engine
+
+Base.metadata.create_all(get_engine())
+
+import contextlib
+import pytest
+from sqlalchemy import event
+
+@pytest.fixture
+def count_queries():
+    """Context manager yielding a list that collects every SQL statement run inside it."""
+    @contextlib.contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(get_engine(), 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(get_engine(), 'before_cursor_execute', record)
+    return counter
+
+@pytest.fixture(autouse=True)
+def reset_cli_context():
+    """Drop the CLI's per-login context so no test sees another test's learner."""
+    yield
+    import lib.cli
+    lib.cli.end_context()
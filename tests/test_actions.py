@@ -0,0 +1,115 @@
+# tests/test_actions.py
+import sys
+import os
+import io
+import json
+import uuid
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+import lib.cli
+from lib.cli import cli, main_menu
+from lib.actions import run_batch
+from lib.models import Session, Learner, Word, PracticeSession, ReviewState, LearnerStats
+
+@pytest.fixture
+def learner():
+    session = Session()
+    learner = Learner(name=f"Batch_{uuid.uuid4().hex[:8]}", password="x", target_language="Spanish")
+    session.add(learner)
+    session.commit()
+    tag = "bt" + ''.join(chr(ord('a') + int(ch, 16)) for ch in uuid.uuid4().hex[:8])  # add-word wants letters only
+    yield session, learner, tag
+    session.rollback()
+    session.query(ReviewState).filter_by(learner_id=learner.id).delete()
+    session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    session.query(LearnerStats).filter_by(learner_id=learner.id).delete()
+    session.query(Word).filter(Word.term.like(f"{tag}%")).delete(synchronize_session=False)
+    session.delete(learner)
+    session.commit()
+    session.close()
+
+def test_batch_runs_actions_in_one_session(learner, tmp_path):
+    session, learner, tag = learner
+    records = [
+        {'action': 'add-word', 'term': f"{tag}perro", 'translation': 'dog'},
+        {'action': 'add-word', 'term': f"{tag}perro", 'translation': 'dog'},
+        {'action': 'quiz-submit', 'learner': learner.name.upper(), 'answers': [
+            {'term': f"{tag}perro", 'expected': 'dog', 'response': 'dgo'},
+            {'question': f"What is '{tag}gato'?", 'expected': 'cat', 'response': 'cat'},
+        ]},
+        {'action': 'progress', 'learner': learner.name},
+        {'action': 'review', 'learner': learner.name},
+        {'action': 'export', 'learner': learner.name, 'output': str(tmp_path / "cards.jsonl"), 'format': 'jsonl'},
+        {'action': 'search', 'query': f"{tag}per"},
+        {'action': 'fly'},
+        {'action': 'progress', 'learner': 'nobody-by-this-name'},
+        {'action': 'add-word', 'term': f"{tag}x", 'translation': 'x', 'colour': 'red'},
+    ]
+    lines = [json.dumps(record) for record in records] + ["", "not json"]
+    out = io.StringIO()
+    report = run_batch(session, lines, out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert (report.succeeded, report.failed) == (7, 4)
+    assert [r['result']['status'] for r in results[:2]] == ['added', 'exists']
+    quiz = results[2]['result']
+    assert (quiz['score'], quiz['total']) == (1, 2)  # "dgo" is two edits from "dog"
+    assert results[3]['result']['sessions'] == 1 and results[3]['result']['average'] == 50
+    assert results[4]['result']['words'] == []  # the missed word is due tomorrow, not now
+    assert results[5]['result']['cards'] == 0
+    assert [w['term'] for w in results[6]['result']['words']] == [f"{tag}perro"]
+    assert [r['ok'] for r in results[7:]] == [False] * 4
+    assert "Unknown action" in results[7]['error'] and "not found" in results[8]['error']
+    assert results[10]['line'] == 12  # the blank line is skipped but still counted
+
+def test_batch_keeps_going_after_unexpected_errors(learner, tmp_path):
+    session, learner, tag = learner
+    records = [
+        {'action': 'export', 'learner': learner.name, 'output': str(tmp_path / "missing" / "cards.csv")},  # OSError
+        {'action': 'add-word', 'term': 42, 'translation': 'x'},
+        {'action': 'add-word', 'term': f"{tag}uno", 'translation': 'one'},
+        {'action': 'progress', 'learner': learner.name},
+    ]
+    out = io.StringIO()
+    with patch('lib.actions.search.search_words', side_effect=TypeError("internal bug")):
+        report = run_batch(session, [json.dumps(record) for record in records]
+                           + [json.dumps({'action': 'search', 'query': 'x'})], out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (report.succeeded, report.failed) == (2, 3)
+    assert [r['ok'] for r in results] == [False, False, True, True, False]
+    assert results[0]['error'].startswith(("FileNotFoundError", "OSError"))
+    assert "Invalid term" in results[1]['error']
+    # A TypeError from inside an action is reported as such, not as bad parameters
+    assert results[4]['error'] == "TypeError: internal bug"
+
+def test_batch_command_and_headless_commands(learner, tmp_path):
+    session, learner, tag = learner
+    runner = CliRunner()
+    result = runner.invoke(cli, ['add-word', f"{tag}casa", 'house'])
+    assert "Added word" in result.output
+    result = runner.invoke(cli, ['quiz-submit', '--learner', learner.name, '--answer', f"{tag}casa", 'house', 'the house'])
+    assert result.exit_code == 0, result.output
+    assert "Score: 1/1" in result.output
+    assert "1 sessions" in runner.invoke(cli, ['progress', '--learner', learner.name]).output
+    assert "No weak words." in runner.invoke(cli, ['review', '--learner', learner.name]).output
+    assert "not found" in runner.invoke(cli, ['progress', '--learner', 'nobody-by-this-name']).output
+
+    path = tmp_path / "actions.jsonl"
+    path.write_text("\n".join(json.dumps({'action': 'progress', 'learner': learner.name}) for _ in range(50)) + "\n")
+    result = runner.invoke(cli, ['batch', str(path), '-o', str(tmp_path / "out.jsonl")])
+    assert result.exit_code == 0, result.output
+    assert len((tmp_path / "out.jsonl").read_text().splitlines()) == 50
+    assert "50 succeeded, 0 failed" in result.output
+
+def test_logout_returns_instead_of_recursing(learner, monkeypatch):
+    session, learner, tag = learner
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt', return_value='8'), patch('lib.cli.initial_menu') as initial_menu:
+        main_menu()
+    assert lib.cli.current_user_id is None
+    initial_menu.assert_not_called()
+    result = CliRunner().invoke(cli, ['logout'])
+    assert result.exit_code == 0 and "Logged out." in result.output
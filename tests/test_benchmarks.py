@@ -0,0 +1,34 @@
+# tests/test_benchmarks.py
+import sys
+import os
+import json
+import subprocess
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+try:
+    from run import compare
+finally:
+    sys.path.pop(0)
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {'a': 1.0, 'b': 1.0, 'tiny': 0.0001, 'gone': 2.0}
+    results = {'a': 1.2, 'b': 1.6, 'tiny': 0.0009, 'new': 5.0}
+    assert compare(results, baseline, tolerance=0.5) == [('b', 1.0, 1.6)]
+
+def test_run_writes_json_and_checks_baseline(tmp_path):
+    output = tmp_path / "results.json"
+    args = [sys.executable, os.path.join('benchmarks', 'run.py'), '--sizes', '200', '--learners', '5', '--words', '60',
+            '--sessions', '300', '--repeat', '1', '-o', str(output), '--baseline', str(tmp_path / "baseline.json")]
+    result = subprocess.run(args + ['--save-baseline'], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    results = json.loads(output.read_text())['results']
+    assert 'structures.dll.sort[200]' in results and 'flows.quiz_vocab[sessions=300]' in results
+    assert all(seconds >= 0 for seconds in results.values())
+
+    # A baseline no run can match makes --check fail
+    baseline = {'meta': {}, 'results': {name: -1.0 for name in results}}
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+    result = subprocess.run(args + ['--check'], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 1 and "REGRESSION" in result.stdout
@@ -0,0 +1,177 @@
+# tests/test_bulk_grading.py
+import sys
+import os
+import json
+import uuid
+from datetime import datetime, timezone
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+from lib.cli import cli
+from lib.bulk_grading import grade_submissions, grade_sheets, parse_submissions, GradingReport
+from lib.grading import EXACT, TYPO, WRONG
+from lib.models import Session, Learner, Word, PracticeSession, ReviewState, LearnerStats
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def classroom():
+    session = Session()
+    tag = f"bg{uuid.uuid4().hex[:6]}"
+    learners = [Learner(name=f"{tag}_{i}", password="x", target_language="Spanish") for i in range(2)]
+    words = [Word(term=f"{tag}perro", translation="dog"), Word(term=f"{tag}gato", translation="cat")]
+    session.add_all(learners + words)
+    session.commit()
+    yield session, learners, words, tag
+    session.rollback()
+    ids = [learner.id for learner in learners]
+    session.query(ReviewState).filter(ReviewState.learner_id.in_(ids)).delete(synchronize_session=False)
+    session.query(PracticeSession).filter(PracticeSession.learner_id.in_(ids)).delete(synchronize_session=False)
+    session.query(LearnerStats).filter(LearnerStats.learner_id.in_(ids)).delete(synchronize_session=False)
+    session.query(Learner).filter(Learner.id.in_(ids)).delete(synchronize_session=False)
+    session.query(Word).filter(Word.term.like(f"{tag}%")).delete(synchronize_session=False)
+    session.commit()
+    session.close()
+
+def sheet(learner, tag, responses, **extra):
+    answers = [{'term': f"{tag}{term}", 'expected': expected, 'response': response}
+               for term, expected, response in responses]
+    return json.dumps({'learner': learner, 'answers': answers, **extra})
+
+def test_parse_jsonl_and_csv_sheets(tmp_path):
+    jsonl = tmp_path / "sheets.jsonl"
+    jsonl.write_text("\n".join([
+        sheet("Ana", "", [("perro", "dog", "dog")], lesson_id=2, submitted_at="2024-05-01T09:00:00"),
+        "{broken",
+        json.dumps({'learner': "Ana", 'answers': [{'term': "x", 'response': "y"}]}),
+        json.dumps({'learner': "", 'answers': [{'term': "x", 'expected': "y"}]}),
+    ]), encoding='utf-8')
+    csv_path = tmp_path / "answers.csv"
+    csv_path.write_text("learner,sheet,term,expected,response\n"
+                        "Ana,1,perro,dog,dog\nAna,1,gato,cat,\nAna,2,gato,cat,cat\nBo,,gato,cat,kat\n", encoding='utf-8')
+
+    report = GradingReport()
+    sheets = parse_submissions([str(jsonl), str(csv_path)], report)
+    assert [reason.split(':')[0] for _, reason in report.rejected] == [
+        "unparseable line", "bad sheet", "missing learner or answers"]
+    assert report.rejected[0][0] == "sheets.jsonl:2"
+    first = sheets[0]
+    assert (first.learner, first.lesson_id, first.submitted_at) == ("Ana", 2, datetime(2024, 5, 1, 9, tzinfo=timezone.utc))
+    assert [(s.learner, len(s.answers)) for s in sheets[1:]] == [("Ana", 2), ("Ana", 1), ("Bo", 1)]
+    assert sheets[1].answers[1] == ("gato", "cat", "")
+
+def test_parse_rejects_sheets_with_fields_of_the_wrong_type(tmp_path):
+    jsonl = tmp_path / "sheets.jsonl"
+    jsonl.write_text("\n".join([
+        sheet(42, "", [("perro", "dog", "dog")]),
+        sheet("Ana", "", [("perro", "dog", "dog")], lesson_id="two"),
+        json.dumps({'learner': "Ana", 'answers': [{'term': "perro", 'expected': "dog", 'response': 7}]}),
+        sheet("Ana", "", [("perro", "dog", "dog")]),
+    ]), encoding='utf-8')
+    report = GradingReport()
+    sheets = parse_submissions([str(jsonl)], report)
+    assert [where for where, _ in report.rejected] == ["sheets.jsonl:1", "sheets.jsonl:2", "sheets.jsonl:3"]
+    assert all(reason.startswith("bad sheet") for _, reason in report.rejected)
+    assert [s.learner for s in sheets] == ["Ana"]
+
+def test_grade_sheets_matches_in_process_and_pool():
+    jobs = [('Beginner', [("dog", "dog"), ("the cat", "Cat"), ("elephant", "elefant"), ("dog", "horse")])] * 5
+    expected = [[EXACT, 4, TYPO, WRONG]] * 5
+    assert grade_sheets(jobs, workers=1, chunk_size=2) == expected
+    assert grade_sheets(jobs, workers=2, chunk_size=2) == expected
+
+def test_grade_submissions_records_sessions_stats_and_reviews(classroom, tmp_path):
+    session, (ana, bo), (perro, gato), tag = classroom
+    path = tmp_path / "sheets.jsonl"
+    path.write_text("\n".join([
+        sheet(ana.name, tag, [("perro", "dog", "dog"), ("gato", "cat", "cat")], submitted_at="2024-04-30T10:00:00"),
+        sheet(ana.name.upper(), tag, [("perro", "dog", "cow"), ("gato", "cat", "cat")]),
+        sheet(bo.name, tag, [("perro", "doggy", "dogy"), ("gato", "cat", "mouse")]),
+        sheet("nobody", tag, [("perro", "dog", "dog")]),
+    ]), encoding='utf-8')
+
+    report = grade_submissions(session, [str(path)], workers=1, batch_size=2, now=NOW)
+    assert (report.sheets, report.answers) == (3, 6)
+    assert report.rejected == [("sheets.jsonl:4", "unknown learner 'nobody'")]
+    assert set(report.timings) == {'parse', 'resolve', 'grade', 'write'}
+    assert report.seconds >= max(report.timings.values())
+    assert report.sheets_per_sec > 0
+
+    scores = [score for score, in session.query(PracticeSession.score)
+              .filter_by(learner_id=ana.id).order_by(PracticeSession.id)]
+    assert scores == [100, 50]
+    stats = session.get(LearnerStats, ana.id)
+    assert (stats.session_count, stats.score_total) == (2, 150)
+    assert session.get(Learner, ana.id).proficiency_level == 'Intermediate'
+    assert session.get(Learner, bo.id).proficiency_level == 'Beginner'
+
+    # Ana got perro right then wrong, so it lapsed; gato passed twice in submission order
+    perro_state = session.get(ReviewState, (ana.id, perro.id))
+    gato_state = session.get(ReviewState, (ana.id, gato.id))
+    assert (perro_state.repetitions, perro_state.interval) == (0, 1)
+    assert (gato_state.repetitions, gato_state.interval) == (2, 6)
+    assert session.get(ReviewState, (bo.id, perro.id)).repetitions == 1  # typo within the allowance
+
+    # A second run continues from the stored states and totals
+    path.write_text(sheet(ana.name, tag, [("gato", "cat", "cat")]), encoding='utf-8')
+    grade_submissions(session, [str(path)], workers=1, now=NOW)
+    assert session.get(ReviewState, (ana.id, gato.id)).repetitions == 3
+    assert session.get(LearnerStats, ana.id).session_count == 3
+
+def test_grade_submissions_skips_a_sheet_with_a_numeric_learner(classroom, tmp_path):
+    session, (ana, _), _, tag = classroom
+    path = tmp_path / "sheets.jsonl"
+    path.write_text("\n".join([
+        sheet(42, tag, [("perro", "dog", "dog")]),
+        sheet(ana.name, tag, [("perro", "dog", "dog")]),
+    ]), encoding='utf-8')
+    report = grade_submissions(session, [str(path)], workers=1, now=NOW)
+    assert report.sheets == 1
+    assert [where for where, _ in report.rejected] == ["sheets.jsonl:1"]
+    assert session.query(PracticeSession).filter_by(learner_id=ana.id).count() == 1
+
+def test_grade_submissions_keeps_names_that_differ_in_case_apart(classroom, tmp_path):
+    session, (ana, _), (_, gato), tag = classroom
+    twin = Learner(name=ana.name.upper(), password="x", target_language="Spanish")
+    session.add(twin)
+    session.commit()
+    try:
+        path = tmp_path / "sheets.jsonl"
+        path.write_text("\n".join([
+            sheet(ana.name, tag, [("perro", "dog", "dog")]),
+            sheet(twin.name, tag, [("perro", "dog", "dog"), ("gato", "cat", "cat")]),
+            sheet(ana.name.title(), tag, [("gato", "cat", "cat")]),  # no exact match: the older account
+        ]), encoding='utf-8')
+        report = grade_submissions(session, [str(path)], workers=1, now=NOW)
+        assert (report.sheets, report.rejected) == (3, [])
+        assert session.get(LearnerStats, ana.id).session_count == 2
+        assert session.get(LearnerStats, twin.id).session_count == 1
+        assert session.get(ReviewState, (twin.id, gato.id)).repetitions == 1
+    finally:
+        session.query(ReviewState).filter_by(learner_id=twin.id).delete()
+        session.query(PracticeSession).filter_by(learner_id=twin.id).delete()
+        session.query(LearnerStats).filter_by(learner_id=twin.id).delete()
+        session.delete(twin)
+        session.commit()
+
+def test_grade_submissions_rejects_an_empty_batch_size(classroom, tmp_path):
+    session, (ana, _), _, tag = classroom
+    path = tmp_path / "sheets.jsonl"
+    path.write_text(sheet(ana.name, tag, [("perro", "dog", "dog")]), encoding='utf-8')
+    with pytest.raises(ValueError):
+        grade_submissions(session, [str(path)], workers=1, batch_size=0, now=NOW)
+    assert session.query(PracticeSession).filter_by(learner_id=ana.id).count() == 0
+    result = CliRunner().invoke(cli, ['grade-submissions', str(path), '--batch-size', '0'])
+    assert result.exit_code == 2 and "--batch-size" in result.output
+
+def test_grade_submissions_command(classroom, tmp_path):
+    session, (ana, _), _, tag = classroom
+    path = tmp_path / "answers.tsv"
+    path.write_text(f"learner\tterm\texpected\tresponse\n{ana.name}\t{tag}perro\tdog\tdog\nghost\t{tag}gato\tcat\tcat\n",
+                    encoding='utf-8')
+    result = CliRunner().invoke(cli, ['grade-submissions', str(path), '--workers', '1'])
+    assert result.exit_code == 0, result.output
+    assert "Graded 1 sheets (1 answers)" in result.output
+    assert "unknown learner 'ghost'" in result.output
+    assert session.query(PracticeSession).filter_by(learner_id=ana.id).count() == 1
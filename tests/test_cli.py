@@ -6,8 +6,9 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
 from unittest.mock import patch
-from lib.cli import new_user, add_word, current_user_id
-from lib.models import Session, Learner, Word
+import lib.cli
+from lib.cli import new_user, log_in, add_word, export_flashcards, practice_grammar, quiz_vocab, review_words, current_user_id
+from lib.models import Session, Learner, Word, Lesson, PracticeSession, ReviewState
 
 @pytest.fixture
 def db_session():
@@ -27,6 +28,30 @@ def test_new_user(db_session):
     db_session.delete(learner)
     db_session.commit()
 
+def test_log_in_matches_the_exact_name(db_session):
+    base = f"Case_{uuid.uuid4().hex[:8]}"
+    upper = Learner(name=base.upper(), password="upper-pass", target_language="Spanish")
+    lower = Learner(name=base.lower(), password="lower-pass", target_language="French")
+    db_session.add_all([upper, lower])
+    db_session.commit()
+    try:
+        with patch('click.prompt', return_value=base.lower()), patch('getpass.getpass', return_value="lower-pass"):
+            log_in()
+        assert lib.cli.current_user_id == lower.id
+        with patch('click.prompt', return_value=base), patch('getpass.getpass', return_value="upper-pass"):
+            lib.cli.current_user_id = None
+            log_in()
+        assert lib.cli.current_user_id is None  # no account is named exactly that
+        # Lookups by name prefer the exact spelling when only case differs
+        assert Learner.find_by_name(db_session, base.lower()).id == lower.id
+        assert Learner.find_by_name(db_session, base.upper()).id == upper.id
+        assert Learner.find_by_name(db_session, base).id == upper.id  # else the oldest
+    finally:
+        lib.cli.current_user_id = None
+        db_session.delete(upper)
+        db_session.delete(lower)
+        db_session.commit()
+
 def test_add_word(db_session):
     global current_user_id
     unique_name = f"TestAdd_{uuid.uuid4().hex[:8]}"
@@ -50,4 +75,117 @@ def test_add_word(db_session):
         session.delete(learner)
         session.commit()
     session.close()
-    current_user_id = None
\ No newline at end of file
+    current_user_id = None
+
+def test_export_flashcards_bounded_queries(db_session, count_queries, tmp_path, monkeypatch):
+    unique_name = f"TestExport_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    lessons = []
+    for i in range(3):
+        lesson = Lesson(title=f"Export {i}")
+        lesson.words = [Word(term=f"ex_{uuid.uuid4().hex[:8]}", translation=f"t{i}") for _ in range(3)]
+        lessons.append(lesson)
+    db_session.add_all([learner] + lessons)
+    db_session.commit()
+    for lesson in lessons + lessons:
+        db_session.add(PracticeSession(learner_id=learner.id, lesson_id=lesson.id, score=80))
+    db_session.commit()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt') as mock_prompt, count_queries() as statements:
+        mock_prompt.return_value = 'r'
+        export_flashcards()
+    # Learner lookup plus a single DISTINCT join for the words
+    assert len(statements) <= 2
+    rows = (tmp_path / 'flashcards.csv').read_text().splitlines()
+    assert len(rows) == 1 + 9
+
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    for lesson in lessons:
+        for word in lesson.words:
+            db_session.delete(word)
+        db_session.delete(lesson)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_practice_grammar_streams_output(db_session, monkeypatch, capsys):
+    unique_name = f"TestGrammar_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    db_session.add(learner)
+    db_session.commit()
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt') as mock_prompt, patch('lib.cli.correct_grammar_stream') as mock_stream:
+        mock_prompt.side_effect = ['hola como estas', 'r']
+        mock_stream.return_value = iter(["¡Hola, ", "¿cómo ", "estás?"])
+        practice_grammar()
+    assert "¡Hola, ¿cómo estás?\n" in capsys.readouterr().out
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_quiz_vocab_records_session_and_reviews(db_session, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    unique_name = f"TestQuiz_{uuid.uuid4().hex[:8]}"
+    term = f"quiz{uuid.uuid4().hex[:6]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    word = Word(term=term, translation="this")
+    db_session.add_all([learner, word])
+    db_session.commit()
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('lib.helpers.call_ai') as mock_ai, patch('click.prompt') as mock_prompt:
+        mock_ai.return_value = f"1. Question: What is '{term}'? Answer: this\n2. Question: Who? Answer: That"
+        mock_prompt.side_effect = ['this', 'nope', 'r']
+        quiz_vocab()
+    db_session.expire_all()
+    assert learner.stats.session_count == 1
+    assert learner.get_average_score() == 50
+    state = db_session.get(ReviewState, (learner.id, word.id))
+    assert state is not None and state.repetitions == 1
+    db_session.delete(state)
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    db_session.delete(word)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_quiz_vocab_accepts_accents_and_typos(db_session, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    learner = Learner(name=f"TestGrade_{uuid.uuid4().hex[:8]}", password="testpass", target_language="Spanish")
+    term = f"grade{uuid.uuid4().hex[:6]}"
+    word = Word(term=term, translation="song")
+    db_session.add_all([learner, word])
+    db_session.commit()
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('lib.helpers.call_ai') as mock_ai, patch('click.prompt') as mock_prompt:
+        mock_ai.return_value = f"1. Question: What is '{term}'? Answer: a song\n2. Question: Say 'song' in Spanish. Answer: canción"
+        mock_prompt.side_effect = ['Song!', 'canciom', 'r']
+        quiz_vocab()
+    db_session.expire_all()
+    assert learner.get_average_score() == 100
+    state = db_session.get(ReviewState, (learner.id, word.id))
+    assert state.repetitions == 1 and state.ease < 2.6  # graded below a perfect answer
+    db_session.delete(state)
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    db_session.delete(word)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_learner_context_reused_across_menu_actions(db_session, monkeypatch, count_queries):
+    unique_name = f"TestContext_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    db_session.add(learner)
+    db_session.commit()
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt', return_value='r'):
+        review_words()
+        context = lib.cli.get_context()
+        with count_queries() as statements:
+            review_words()
+        assert statements == []  # learner and review list come from the context
+        assert lib.cli.get_context() is context
+        context.refresh()
+        with count_queries() as statements:
+            review_words()
+        assert statements  # refresh forces the review list to be reloaded
+    lib.cli.end_context()
+    db_session.delete(learner)
+    db_session.commit()
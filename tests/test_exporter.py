@@ -0,0 +1,110 @@
+# tests/test_exporter.py
+import sys
+import os
+import gzip
+import json
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+from lib.cli import cli
+from lib.exporter import export_flashcards, export_delta, flashcard_rows
+from lib.models import Session, Learner, Word, Lesson, PracticeSession, ExportWatermark, ExportedWord
+
+@pytest.fixture
+def learner_with_words():
+    session = Session()
+    learner = Learner(name=f"Export_{uuid.uuid4().hex[:8]}", password="x", target_language="Spanish")
+    lesson = Lesson(title="Export lesson")
+    lesson.words = [Word(term=f"exp{uuid.uuid4().hex[:6]}_{i}", translation=f"t\t{i}", example_sentence="Ej.")
+                    for i in range(5)]
+    session.add_all([learner, lesson])
+    session.commit()
+    for _ in range(3):
+        session.add(PracticeSession(learner_id=learner.id, lesson_id=lesson.id, score=60))
+    session.commit()
+    yield session, learner, lesson
+    session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    for word in lesson.words:
+        session.delete(word)
+    session.delete(lesson)
+    session.delete(learner)
+    session.commit()
+    session.close()
+
+def test_flashcard_rows_are_plain_tuples(learner_with_words):
+    session, learner, lesson = learner_with_words
+    rows = list(flashcard_rows(session, learner, batch_size=2))
+    assert len(rows) == 5
+    assert all(type(row) is tuple and len(row) == 4 for row in rows)
+
+def test_export_formats(learner_with_words, tmp_path):
+    session, learner, lesson = learner_with_words
+    assert export_flashcards(session, learner, str(tmp_path / "cards.csv")) == 5
+    assert (tmp_path / "cards.csv").read_text().splitlines()[0] == "term,translation"
+
+    export_flashcards(session, learner, str(tmp_path / "cards.txt"), fmt='anki')
+    anki = (tmp_path / "cards.txt").read_text().splitlines()
+    assert anki[0] == "#separator:tab" and len(anki) == 3 + 5
+    assert all(line.count("\t") == 1 for line in anki[3:])  # tabs inside fields are flattened
+
+    export_flashcards(session, learner, str(tmp_path / "cards.jsonl.gz"), fmt='jsonl')
+    with gzip.open(tmp_path / "cards.jsonl.gz", 'rt', encoding='utf-8') as f:
+        cards = [json.loads(line) for line in f]
+    assert {card['example_sentence'] for card in cards} == {"Ej."}
+    with pytest.raises(ValueError):
+        export_flashcards(session, learner, str(tmp_path / "cards.xml"), fmt='xml')
+
+def test_delta_export_emits_words_added_to_practised_lessons(learner_with_words, tmp_path):
+    session, learner, lesson = learner_with_words
+    out = tmp_path / "delta.csv"
+    assert export_delta(session, learner, str(out))['cards'] == 5
+    # Attached to an already practised lesson with no new session, as add-word --lesson-id does
+    late = Word(term=f"late{uuid.uuid4().hex[:6]}", translation="late")
+    lesson.words.append(late)
+    session.commit()
+    second = export_delta(session, learner, str(out))
+    assert second['cards'] == 1 and late.term in out.read_text()
+    assert export_delta(session, learner, str(out))['cards'] == 0
+
+    session.query(ExportedWord).filter_by(learner_id=learner.id).delete()
+    session.query(ExportWatermark).filter_by(learner_id=learner.id).delete()
+    session.commit()
+
+def test_export_command_to_stdout(learner_with_words):
+    session, learner, lesson = learner_with_words
+    result = CliRunner().invoke(cli, ['export', '--learner', learner.name, '--format', 'jsonl', '-o', '-'])
+    assert result.exit_code == 0, result.output
+    lines = [line for line in result.output.splitlines() if line.startswith("{")]
+    assert len(lines) == 5
+
+def test_delta_export_only_emits_new_words(learner_with_words, tmp_path):
+    session, learner, lesson = learner_with_words
+    out = tmp_path / "delta.jsonl"
+    first = export_delta(session, learner, str(out), fmt='jsonl')
+    assert first['full'] and first['cards'] == 5
+    assert json.loads((tmp_path / "delta.jsonl.manifest.json").read_text())['cards'] == 5
+
+    # Practising the same lesson again adds nothing; a new lesson adds only its words
+    session.add(PracticeSession(learner_id=learner.id, lesson_id=lesson.id, score=90))
+    extra = Lesson(title="Delta lesson", words=[lesson.words[0], Word(term=f"delta{uuid.uuid4().hex[:6]}", translation="d")])
+    session.add(extra)
+    session.commit()
+    session.add(PracticeSession(learner_id=learner.id, lesson_id=extra.id, score=80))
+    session.commit()
+
+    second = export_delta(session, learner, str(out), fmt='jsonl')
+    assert second['since_session_id'] == first['through_session_id'] and not second['full']
+    assert [json.loads(line)['term'] for line in out.read_text().splitlines()] == [extra.words[1].term]
+    assert export_delta(session, learner, str(out), fmt='jsonl')['cards'] == 0
+    # Another target keeps its own watermark
+    assert export_delta(session, learner, str(out), fmt='jsonl', target='anki')['cards'] == 6
+
+    session.query(ExportedWord).filter_by(learner_id=learner.id).delete()
+    session.query(ExportWatermark).filter_by(learner_id=learner.id).delete()
+    session.query(PracticeSession).filter_by(lesson_id=extra.id).delete()
+    new_word = extra.words[1]
+    session.delete(extra)
+    session.delete(new_word)
+    session.commit()
@@ -0,0 +1,49 @@
+# tests/test_grading.py
+import sys
+import os
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.grading import (AnswerKey, EXACT, NORMALIZED, TYPO, WRONG, accepted_answers, bounded_distance,
+                         grade_answer, grade_many, normalize)
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def test_normalize_folds_accents_punctuation_and_articles():
+    assert normalize("  ¡El Niño!  ") == "nino"
+    assert normalize("to eat") == "eat"
+    assert normalize("L'homme") == "homme"
+    assert normalize("the") == "the"  # an article on its own is the answer
+    assert accepted_answers("hello / hi, hey (informal)") == ["hello", "hi", "hey"]
+
+def test_bounded_distance_matches_levenshtein():
+    rng = random.Random(3)
+    for _ in range(5000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randrange(9)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randrange(9)))
+        limit = rng.randrange(4)
+        distance = levenshtein(a, b)
+        assert bounded_distance(a, b, limit) == (distance if distance <= limit else limit + 1)
+
+def test_grade_levels_and_alternatives():
+    assert grade_answer("Hello / hi", "hi").quality == EXACT
+    assert grade_answer("canción", "Cancion").quality == NORMALIZED
+    assert grade_answer("the house", "house").quality == NORMALIZED
+    typo = grade_answer("tomorrow", "tommorow", "Beginner")
+    assert (typo.quality, typo.distance, typo.correct) == (TYPO, 2, True)
+    assert grade_answer("tomorrow", "tommorow", "Advanced").quality == WRONG
+    assert grade_answer("cat", "car", "Beginner").quality == WRONG  # too short for typos
+    assert grade_answer("goodbye", "hello").quality == WRONG
+    assert AnswerKey("thank you / thanks", "Beginner").grade("thankz").expected == "thanks"
+
+def test_grade_many_reuses_results():
+    grades = grade_many([("hello", "helo"), ("hello", "helo"), ("bye", "bye")], "Beginner")
+    assert grades[0] is grades[1]
+    assert [grade.quality for grade in grades] == [TYPO, TYPO, EXACT]
@@ -0,0 +1,202 @@
+# tests/test_helpers.py
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+import lib.helpers
+from lib.cache import ResponseCache
+from lib.helpers import (call_ai, call_ai_many, call_ai_stream, correct_grammar, correct_grammar_stream, simulate_convo, simulate_convo_stream,
+                         QuizStreamParser, parse_quiz, stream_quiz_for, fallback_quiz, ai_timeout, extract_quiz_term)
+
+def fake_completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'), ttl=60, max_entries=3)
+    yield cache
+    cache.close()
+
+def test_response_cache_ttl_and_counters(cache):
+    key = cache.make_key('gpt-4o', 0.7, [{"role": "user", "content": "hi"}])
+    assert cache.get(key) is None
+    cache.set(key, "hola")
+    assert cache.get(key) == "hola"
+    with patch('lib.cache.time.time', return_value=10 ** 12):
+        assert cache.get(key) is None  # expired
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'entries': 0}
+
+def test_response_cache_lru_eviction(cache):
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key.upper())
+    cache.get('a')  # 'b' is now least recently used
+    with patch('lib.cache.time.time', side_effect=lambda: 2 * 10 ** 9):
+        cache.set('d', 'D')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.stats()['entries'] == 3
+
+def test_call_ai_uses_cache(cache, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(lib.helpers, '_cache', cache)
+    client = MagicMock()
+    client.chat.completions.create.return_value = fake_completion("1. Question: Q Answer: A")
+    with patch('lib.helpers.get_client', return_value=client):
+        assert call_ai("quiz me") == "1. Question: Q Answer: A"
+        assert call_ai("quiz me") == "1. Question: Q Answer: A"
+        assert client.chat.completions.create.call_count == 1
+        call_ai("quiz me", use_cache=False)
+        call_ai("quiz me", temperature=0.2)
+        assert client.chat.completions.create.call_count == 3
+    assert cache.hits == 1
+
+def test_call_ai_without_key_skips_cache(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    with patch('lib.helpers.get_cache') as get_cache:
+        assert call_ai("quiz me") is None
+    get_cache.assert_not_called()
+
+def slow_client(delays):
+    def create(model, messages, temperature, **options):
+        prompt = messages[-1]["content"]
+        time.sleep(delays(prompt))
+        return fake_completion(f"reply to {prompt[:20]}")
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+def test_simulate_convo_runs_calls_concurrently(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_CACHE_DISABLED', '1')
+    learner = SimpleNamespace(target_language="Spanish", proficiency_level="Beginner")
+    with patch('lib.helpers.get_client', return_value=slow_client(lambda prompt: 0.3)):
+        start = time.perf_counter()
+        response, feedback = simulate_convo(learner, "hola")
+        elapsed = time.perf_counter() - start
+    assert response.startswith("reply to Respond") and feedback.startswith("reply to Provide")
+    assert elapsed < 0.55  # roughly max(0.3, 0.3), not 0.6
+
+def test_call_ai_many_timeout(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_CACHE_DISABLED', '1')
+    with patch('lib.helpers.get_client', return_value=slow_client(lambda prompt: 0.5 if prompt == "slow" else 0)):
+        results = call_ai_many(["fast", "slow"], timeout=0.2)
+    assert results == ["reply to fast", None]
+
+def fake_stream(pieces, delay=0):
+    def create(model, messages, temperature, stream=False, **options):
+        assert stream
+        def chunks():
+            for piece in pieces:
+                time.sleep(delay)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+            yield SimpleNamespace(choices=[])  # usage-only chunk at the end
+        return chunks()
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+def test_call_ai_stream_yields_incrementally_and_caches(cache, monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setattr(lib.helpers, '_cache', cache)
+    pieces = ["Hola", ", ", "¿qué", " tal?"]
+    client = fake_stream(pieces, delay=0.05)
+    with patch('lib.helpers.get_client', return_value=client):
+        start = time.perf_counter()
+        stream = call_ai_stream("greet me")
+        first = next(stream)
+        first_token = time.perf_counter() - start
+        rest = list(stream)
+        assert first_token < 0.15 < time.perf_counter() - start
+        assert [first] + rest == pieces
+        # Second call is served whole from the cache
+        assert list(call_ai_stream("greet me")) == ["Hola, ¿qué tal?"]
+        assert client.chat.completions.create.call_count == 1
+
+def test_streaming_fallbacks_without_key(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    assert list(call_ai_stream("anything")) == []
+    assert "".join(correct_grammar_stream("hola como estas", "Spanish")) == correct_grammar("hola como estas", "Spanish")
+    learner = SimpleNamespace(target_language="Spanish", proficiency_level="Beginner")
+    reply, get_feedback = simulate_convo_stream(learner, "hola")
+    assert ("".join(reply), get_feedback()) == simulate_convo(learner, "hola")
+
+def test_simulate_convo_stream_runs_feedback_in_background(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_CACHE_DISABLED', '1')
+    streaming = fake_stream(["Muy ", "bien"]).chat.completions.create
+    def create(stream=False, **kwargs):
+        return streaming(stream=True, **kwargs) if stream else fake_completion("Good input")
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    learner = SimpleNamespace(target_language="Spanish", proficiency_level="Beginner")
+    with patch('lib.helpers.get_client', return_value=client):
+        reply, get_feedback = simulate_convo_stream(learner, "hola")
+        assert "".join(reply) == "Muy bien"
+        assert get_feedback() == "Good input"
+
+QUIZ_TOKENS = ["1.", "2.", "12.", "3. ", " Question:", "Question: ", "Answer:", " Answer: ", "\n", "\n\n", " ",
+               "hola", "What is 'gato'?", "cat", "4", ".", "\n5.", "Answer"]
+
+@pytest.mark.parametrize("seed", range(300))
+def test_quiz_stream_parser_matches_regex(seed):
+    rng = random.Random(seed)
+    text = "".join(rng.choice(QUIZ_TOKENS) for _ in range(rng.randrange(1, 60)))
+    parser = QuizStreamParser()
+    streamed = []
+    pos = 0
+    while pos < len(text):
+        step = rng.randrange(1, 8)
+        streamed.extend(parser.feed(text[pos:pos + step]))
+        pos += step
+    streamed.extend(parser.close())
+    assert streamed == parse_quiz(text)
+
+def test_quiz_stream_parser_emits_each_block_once_complete():
+    parser = QuizStreamParser()
+    assert parser.feed("1. Question: What is 'hola'?\nAnswer: hel") == []
+    assert parser.feed("lo\n2") == []
+    assert parser.feed(". Question: What is 'gato'? Answer: cat") == [("What is 'hola'?", "hello")]
+    assert parser.close() == [("What is 'gato'?", "cat")]
+
+def test_stream_quiz_yields_before_stream_finishes(monkeypatch):
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_CACHE_DISABLED', '1')
+    pieces = ["1. Question: A? Answer: a", "\n2. Question: B? Answer: b", "\n3. Question: C? Answer: c"]
+    with patch('lib.helpers.get_client', return_value=fake_stream(pieces)):
+        quiz = stream_quiz_for("Spanish", "Beginner")
+        assert next(quiz) == ("A?", "a")
+        assert list(quiz) == [("B?", "b"), ("C?", "c")]
+
+def test_stream_quiz_falls_back(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    assert list(stream_quiz_for("Spanish", "Beginner")) == fallback_quiz("Spanish")
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_CACHE_DISABLED', '1')
+    with patch('lib.helpers.get_client', return_value=fake_stream(["no quiz here"])):
+        assert list(stream_quiz_for("French", "Beginner")) == fallback_quiz("French")
+
+def test_quiz_fallback_callable_comes_before_static_quiz(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    local = [("What is 'perro' in English?", "dog")]
+    assert list(stream_quiz_for("Spanish", "Beginner", lambda: local)) == local
+    # An empty local quiz (no words yet) still ends in the static one
+    assert list(stream_quiz_for("Spanish", "Beginner", lambda: [])) == fallback_quiz("Spanish")
+
+def test_ai_timeout_reads_env(monkeypatch):
+    monkeypatch.delenv('LINGUA_AI_TIMEOUT', raising=False)
+    assert ai_timeout() == 30
+    monkeypatch.setenv('LINGUA_AI_TIMEOUT', '4.5')
+    assert ai_timeout() == 4.5
+
+def test_extract_quiz_term_keeps_apostrophes():
+    assert extract_quiz_term("What is 'hola' in English?") == "hola"
+    assert extract_quiz_term("What is 'l'eau' in English?") == "l'eau"
+    assert extract_quiz_term("What's 'aujourd'hui'?") == "aujourd'hui"
+    assert extract_quiz_term("Translate “cañón”.") == "cañón"
+    assert extract_quiz_term("No quotes here") is None
@@ -0,0 +1,118 @@
+# tests/test_importer.py
+import sys
+import os
+import json
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+from lib.cli import cli
+from lib.importer import import_words, MAX_BATCH
+from lib.models import Session, Word, Lesson
+
+@pytest.fixture
+def db_session():
+    session = Session()
+    yield session
+    session.rollback()
+    session.close()
+
+def cleanup(session, prefix, lesson=None):
+    if lesson is not None:
+        lesson.words = []
+        session.delete(lesson)
+    session.query(Word).filter(Word.term.like(f"{prefix}%")).delete(synchronize_session=False)
+    session.commit()
+
+def test_import_csv_upserts_in_batches(db_session, tmp_path):
+    prefix = f"imp{uuid.uuid4().hex[:6]}_"
+    db_session.add(Word(term=f"{prefix}0", translation="old", part_of_speech="noun"))
+    db_session.commit()
+    path = tmp_path / "vocab.csv"
+    lines = ["term,translation,part_of_speech"]
+    lines += [f"{prefix}{i},t{i}," for i in range(25)]
+    lines += [f"{prefix}x,,noun", f",orphan,"]
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    report = import_words(db_session, str(path), batch_size=10)
+    assert report.imported == 25
+    assert [reason for _, reason in report.rejected] == ["missing translation", "missing term"]
+    assert report.rows_per_sec > 0
+    db_session.expire_all()
+    updated = db_session.query(Word).filter_by(term=f"{prefix}0").one()
+    assert (updated.translation, updated.part_of_speech) == ("t0", "noun")
+    assert db_session.query(Word).filter(Word.term.like(f"{prefix}%")).count() == 25
+    cleanup(db_session, prefix)
+
+def test_import_jsonl_and_tsv_attach_to_lesson(db_session, tmp_path):
+    prefix = f"imp{uuid.uuid4().hex[:6]}_"
+    lesson = Lesson(title="Imported")
+    db_session.add(lesson)
+    db_session.commit()
+    jsonl = tmp_path / "vocab.jsonl"
+    jsonl.write_text("\n".join([json.dumps({"term": f"{prefix}a", "translation": "a"}), "{broken",
+                                json.dumps({"term": f"{prefix}b", "translation": "b"})]), encoding='utf-8')
+    tsv = tmp_path / "vocab.tsv"
+    tsv.write_text(f"term\ttranslation\n{prefix}b\tbee\n{prefix}c\tsee\n", encoding='utf-8')
+
+    assert import_words(db_session, str(jsonl), lesson_id=lesson.id).rejected == [(2, "unparseable line")]
+    assert import_words(db_session, str(tsv), lesson_id=lesson.id).imported == 2
+    db_session.refresh(lesson)
+    assert sorted(w.term for w in lesson.words) == [f"{prefix}a", f"{prefix}b", f"{prefix}c"]
+    with pytest.raises(ValueError):
+        import_words(db_session, str(tsv), lesson_id=10 ** 9)
+    cleanup(db_session, prefix, lesson)
+
+def test_import_caps_batches_and_counts_repeated_terms(db_session, tmp_path, monkeypatch):
+    import lib.importer as importer
+    prefix = f"imp{uuid.uuid4().hex[:6]}_"
+    lesson = Lesson(title="Capped")
+    db_session.add(lesson)
+    db_session.commit()
+    batches = []
+    flush = importer._flush
+    monkeypatch.setattr(importer, '_flush', lambda session, batch, lesson_id: batches.append(len(batch)) or flush(session, batch, lesson_id))
+    path = tmp_path / "vocab.csv"
+    lines = ["term,translation"] + [f"{prefix}{i},t{i}" for i in range(MAX_BATCH + 50)]
+    lines += [f"{prefix}0,again", f"{prefix}0,last"]
+    path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+
+    report = import_words(db_session, str(path), lesson_id=lesson.id, batch_size=5000)
+    assert batches == [MAX_BATCH, 51]
+    # The repeat in the second batch counts; the one against the first batch is a normal upsert
+    assert (report.imported, report.duplicates) == (MAX_BATCH + 51, 1)
+    assert db_session.query(Word).filter_by(term=f"{prefix}0").one().translation == "last"
+    db_session.refresh(lesson)
+    assert len(lesson.words) == MAX_BATCH + 50
+    cleanup(db_session, prefix, lesson)
+
+def test_import_rejects_unreadable_rows_and_keeps_going(db_session, tmp_path):
+    prefix = f"imp{uuid.uuid4().hex[:6]}_"
+    path = tmp_path / "vocab.csv"
+    path.write_bytes(b"term,translation\n" +
+                     f"{prefix}a,a\n{prefix}b,".encode() + b"x" * 140000 + b"\n" +
+                     f"{prefix}c,caf".encode() + b"\xe9\n" +
+                     f"{prefix}d,d\n".encode())
+    report = import_words(db_session, str(path))
+    assert report.rejected == [(3, "unparseable line"), (4, "unparseable line")]
+    assert report.imported == 2
+    jsonl = tmp_path / "vocab.jsonl"
+    jsonl.write_bytes(b'{"term": "' + prefix.encode() + b'e", "translation": "caf\xe9"}\n' +
+                      json.dumps({"term": f"{prefix}f", "translation": "f"}).encode())
+    report = import_words(db_session, str(jsonl))
+    assert (report.imported, report.rejected) == (1, [(1, "unparseable line")])
+    assert sorted(term for term, in db_session.query(Word.term).filter(Word.term.like(f"{prefix}%"))) == [
+        f"{prefix}a", f"{prefix}d", f"{prefix}f"]
+    cleanup(db_session, prefix)
+
+def test_import_words_command(db_session, tmp_path):
+    prefix = f"imp{uuid.uuid4().hex[:6]}_"
+    path = tmp_path / "vocab.csv"
+    path.write_text(f"term,translation\n{prefix}1,one\n{prefix}2,\n{prefix}1,uno\n", encoding='utf-8')
+    result = CliRunner().invoke(cli, ['import-words', str(path)])
+    assert result.exit_code == 0, result.output
+    assert "Imported 1 words" in result.output
+    assert "Merged 1 repeated terms" in result.output
+    assert "line 3: missing translation" in result.output
+    cleanup(db_session, prefix)
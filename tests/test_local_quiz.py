@@ -0,0 +1,159 @@
+# tests/test_local_quiz.py
+import sys
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import lib.cli
+import lib.prefetch
+from lib.cli import quiz_vocab
+from lib.helpers import extract_quiz_term, fallback_quiz
+from lib.local_quiz import LocalQuiz, word_weight, NEW_WEIGHT, DUE_WEIGHT, LAPSED_WEIGHT, SCHEDULED_WEIGHT
+from lib.models import Session, Learner, Word, Lesson, PracticeSession, ReviewState, LearnerStats
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def deck():
+    session = Session()
+    tag = f"lq{uuid.uuid4().hex[:6]}"
+    learner = Learner(name=f"{tag}_learner", password="x", target_language="Spanish")
+    lesson = Lesson(title=f"{tag} lesson")
+    lesson.words = [Word(term=f"{tag}{i}", translation=f"meaning {i}") for i in range(20)]
+    session.add_all([learner, lesson])
+    session.commit()
+    yield session, learner, lesson, tag
+    session.rollback()
+    session.query(ReviewState).filter_by(learner_id=learner.id).delete()
+    session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    session.query(LearnerStats).filter_by(learner_id=learner.id).delete()
+    words = list(lesson.words)
+    lesson.words = []
+    session.delete(lesson)
+    for word in words:
+        session.delete(word)
+    session.delete(learner)
+    session.commit()
+    session.close()
+
+def test_word_weight_prefers_due_and_weak_words():
+    due, ahead = NOW - timedelta(days=1), NOW + timedelta(days=3)
+    assert word_weight(None, NOW) == NEW_WEIGHT
+    assert word_weight((due, 2, 2.5, due), NOW) == DUE_WEIGHT
+    assert word_weight((due, 0, 2.5, due), NOW) == LAPSED_WEIGHT
+    assert word_weight((ahead, 2, 2.5, due), NOW) == SCHEDULED_WEIGHT
+    assert word_weight((due, 2, 1.5, due), NOW) > DUE_WEIGHT
+
+def test_local_quiz_weights_questions_by_review_state(deck):
+    session, learner, lesson, tag = deck
+    words = lesson.words
+    for word in words[:10]:
+        session.add(ReviewState(learner_id=learner.id, word_id=word.id, repetitions=3, interval=30,
+                                due_date=NOW + timedelta(days=30), last_reviewed=NOW))
+    session.add(ReviewState(learner_id=learner.id, word_id=words[10].id, repetitions=0, interval=1,
+                            due_date=NOW - timedelta(days=1), last_reviewed=NOW - timedelta(days=2)))
+    session.commit()
+
+    quiz = LocalQuiz(learner.id, lesson_id=lesson.id, rng=random.Random(5))
+    questions = quiz.questions(session, count=5, now=NOW)
+    assert len({question for question, _ in questions}) == 5
+    question, answer = questions[0]
+    term = extract_quiz_term(question)
+    assert answer == next(word.translation for word in words if word.term == term)
+
+    counts = {}
+    for _ in range(3000):
+        word_id = quiz.sampler.sample()
+        counts[word_id] = counts.get(word_id, 0) + 1
+    # The lapsed word beats any single new word, which beats any word reviewed a month out
+    assert counts[words[10].id] > counts[words[15].id] > counts[words[0].id]
+
+def test_local_quiz_refreshes_incrementally(deck):
+    session, learner, lesson, tag = deck
+    quiz = LocalQuiz(learner.id, lesson_id=lesson.id, rng=random.Random(2))
+    quiz.sync(session, now=NOW)
+    assert len(quiz.sampler) == 20
+
+    # Grading pushes the word's review out, so its weight drops straight away
+    word = lesson.words[0]
+    states = learner.grade_quiz_words(session, [(word.term, 5)], now=NOW)
+    session.commit()
+    quiz.update(states, now=NOW)
+    assert quiz.sampler.weight(word.id) == SCHEDULED_WEIGHT
+    # ... and rises again once the review falls due
+    quiz.sync(session, now=NOW + timedelta(days=2))
+    assert quiz.sampler.weight(word.id) == DUE_WEIGHT
+
+    # Words added later are picked up without reloading the rest
+    lesson.words.append(Word(term=f"{tag}new", translation="new"))
+    session.commit()
+    quiz.sync(session, now=NOW)
+    assert len(quiz.sampler) == 21
+
+def test_quiz_vocab_offline_uses_local_words(deck, monkeypatch):
+    session, learner, lesson, tag = deck
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    monkeypatch.setenv('LINGUA_LOCAL_QUIZ_SIZE', '4')
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    asked = []
+
+    def echo(text='', **kwargs):
+        term = extract_quiz_term(text)
+        if term:
+            asked.append(term)
+
+    def answer(text, *args, **kwargs):
+        return Word.find_by_term(session, asked[-1]).translation if text == "Your answer" else 'r'
+
+    with patch('click.echo', side_effect=echo), patch('click.prompt', side_effect=answer):
+        quiz_vocab()
+    assert len(set(asked)) == 4
+    session.expire_all()
+    assert learner.stats.session_count == 1
+    assert learner.get_average_score() == 100
+    assert session.query(ReviewState).filter_by(learner_id=learner.id).count() == 4
+
+def test_offline_quizzes_after_prefetch_still_use_local_words(deck, monkeypatch):
+    # An API key is set but every call fails: the prefetch pool must not hand out the static quiz
+    session, learner, lesson, tag = deck
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    monkeypatch.setenv('LINGUA_LOCAL_QUIZ_SIZE', '3')
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    monkeypatch.setattr(lib.prefetch, '_pool', None)
+    pool = lib.prefetch.get_quiz_pool()
+    pool._submit = lambda fn, *args: fn(*args)  # fill synchronously
+    static_terms = {extract_quiz_term(question) for question, _ in fallback_quiz("Spanish")}
+    asked = []
+
+    def echo(text='', **kwargs):
+        term = extract_quiz_term(text)
+        if term:
+            asked.append(term)
+
+    with patch('lib.helpers.call_ai', return_value=None), patch('lib.helpers.call_ai_stream', return_value=iter(())), \
+            patch('click.echo', side_effect=echo), \
+            patch('click.prompt', side_effect=lambda text, *a, **k: 'x' if text == "Your answer" else 'r'):
+        lib.prefetch.prefetch_quiz("Spanish", "Beginner")
+        quiz_vocab()
+        quiz_vocab()
+    assert len(asked) == 6
+    assert not static_terms & set(asked)
+    assert all(Word.find_by_term(session, term) for term in asked)
+    assert pool.metrics()['hits'] == 0
+
+def test_local_quiz_terms_with_apostrophes_are_graded(deck):
+    session, learner, lesson, tag = deck
+    word = Word(term=f"l'eau{tag}", translation="the water")
+    lesson.words.append(word)
+    session.commit()
+    quiz = LocalQuiz(learner.id, lesson_id=lesson.id, rng=random.Random(0))
+    question = next(q for q, _ in quiz.questions(session, count=21, now=NOW) if word.term in q)
+    states = learner.grade_quiz_words(session, [(extract_quiz_term(question), 5)], now=NOW)
+    session.commit()
+    assert [state.word_id for state in states] == [word.id]
+    quiz.update(states, now=NOW)
+    assert quiz.sampler.weight(word.id) == SCHEDULED_WEIGHT
@@ -5,7 +5,9 @@ import uuid
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
-from lib.models import Session, Learner, Word, Lesson, PracticeSession
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from lib.models import make_engine, Session, Learner, Word, Lesson, PracticeSession, LearnerStats, ReviewState
 
 @pytest.fixture
 def db_session():
@@ -47,4 +49,169 @@ def test_learner_oop_features(db_session):
     # Delete sessions first to avoid NOT NULL constraint
     db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
     db_session.delete(learner)
-    db_session.commit()
\ No newline at end of file
+    db_session.commit()
+
+def test_learner_stats_incremental(db_session):
+    unique_name = f"StatsTest_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    db_session.add(learner)
+    db_session.commit()
+    assert learner.get_average_score() == 0
+    learner.add_session(db_session, score=60)
+    learner.add_session(db_session, score=90)
+    assert learner.stats.session_count == 2
+    assert learner.get_average_score() == 75
+    assert learner.proficiency_level == 'Intermediate'
+    assert learner.stats.last_session_date is not None
+    assert "2 sessions, average score: 75.00" in Learner.get_progress(db_session, learner.id)
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_learner_stats_survive_concurrent_sessions(db_session):
+    learner = Learner(name=f"RaceTest_{uuid.uuid4().hex[:8]}", password="testpass", target_language="Spanish")
+    db_session.add(learner)
+    db_session.commit()
+    other = Session()
+    try:
+        # Both sessions have read the learner's (missing, then stale) stats before either writes
+        mine, theirs = learner, other.get(Learner, learner.id)
+        assert mine.stats is None and theirs.stats is None
+        mine.add_session(db_session, score=60)
+        theirs.add_session(other, score=80)
+        assert theirs.stats.session_count == 2
+        mine.add_session(db_session, score=100)
+        theirs.add_session(other, score=40)  # theirs still holds the count of 2
+        db_session.expire_all()
+        assert (learner.stats.session_count, learner.stats.score_total) == (4, 280)
+        assert learner.proficiency_level == 'Beginner'
+    finally:
+        other.close()
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_learner_stats_rebuild(db_session):
+    unique_name = f"RebuildTest_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    db_session.add(learner)
+    db_session.commit()
+    # Rows inserted behind add_session's back leave the stats stale until rebuilt
+    db_session.add_all([PracticeSession(learner_id=learner.id, score=s) for s in (40, 80, 90)])
+    db_session.commit()
+    assert learner.session_count == 0
+    assert LearnerStats.rebuild(db_session, learner.id) == 1
+    assert learner.session_count == 3
+    assert learner.get_average_score() == 70
+    db_session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_review_state_sm2_intervals():
+    state = ReviewState(learner_id=1, word_id=1)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    intervals = []
+    for _ in range(3):
+        state.grade(ReviewState.CORRECT, now)
+        intervals.append(state.interval)
+    assert intervals == [1, 6, 16]
+    assert state.due_date == now + timedelta(days=16)
+    state.grade(ReviewState.WRONG, now)
+    assert (state.repetitions, state.interval) == (0, 1)
+    assert state.ease >= ReviewState.MIN_EASE
+
+def test_review_state_interval_is_capped():
+    state = ReviewState(learner_id=1, word_id=1)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for _ in range(50):
+        state.grade(ReviewState.CORRECT, now)
+    assert state.interval == ReviewState.MAX_INTERVAL
+
+def test_scheduled_reviews_feed_weak_words(db_session):
+    unique_name = f"ReviewTest_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    words = [Word(term=f"rev_{uuid.uuid4().hex[:8]}", translation="t") for _ in range(2)]
+    db_session.add_all([learner] + words)
+    db_session.commit()
+    past = datetime.now(timezone.utc) - timedelta(days=3)
+    learner.grade_quiz_words(db_session, [(words[0].term, ReviewState.WRONG), (words[1].term, ReviewState.CORRECT), (None, 5)], now=past)
+    db_session.commit()
+    # First reviews are due a day later whatever the grade, so both are overdue now
+    assert sorted(learner.due_words(db_session)) == sorted(w.term for w in words)
+    learner.schedule_review(db_session, words[1], ReviewState.CORRECT)
+    db_session.commit()
+    assert learner.due_words(db_session) == [words[0].term]
+    learner.load_weak_words(db_session)
+    assert words[0].term in learner.repetition_list
+    db_session.query(ReviewState).filter_by(learner_id=learner.id).delete()
+    for word in words:
+        db_session.delete(word)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_weak_words_keep_the_most_overdue_first(db_session):
+    learner = Learner(name=f"DueOrder_{uuid.uuid4().hex[:8]}", password="testpass", target_language="Spanish")
+    tag = uuid.uuid4().hex[:8]
+    # Alphabetical order is the reverse of due order
+    words = [Word(term=f"{letter}_{tag}", translation="t") for letter in "cba"]
+    db_session.add_all([learner] + words)
+    db_session.commit()
+    now = datetime.now(timezone.utc)
+    for days, word in zip((10, 5, 2), words):
+        learner.schedule_review(db_session, word, ReviewState.WRONG, now=now - timedelta(days=days))
+    db_session.commit()
+    learner.load_weak_words(db_session)
+    assert list(learner.review_weak_words()) == [word.term for word in words]
+    db_session.query(ReviewState).filter_by(learner_id=learner.id).delete()
+    for word in words:
+        db_session.delete(word)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_weak_words_use_bounded_queries(db_session, count_queries):
+    unique_name = f"N1Test_{uuid.uuid4().hex[:8]}"
+    learner = Learner(name=unique_name, password="testpass", target_language="Spanish")
+    lessons = []
+    for i in range(5):
+        lesson = Lesson(title=f"Lesson {i}")
+        lesson.words = [Word(term=f"n1_{uuid.uuid4().hex[:8]}", translation="t") for _ in range(4)]
+        lessons.append(lesson)
+    db_session.add_all([learner] + lessons)
+    db_session.commit()
+    for lesson in lessons:
+        for score in (40, 50):
+            db_session.add(PracticeSession(learner_id=learner.id, lesson_id=lesson.id, score=score))
+    db_session.add(PracticeSession(learner_id=learner.id, lesson_id=lessons[0].id, score=95))
+    db_session.commit()
+    learner_id = learner.id
+    lesson_ids = [lesson.id for lesson in lessons]
+    db_session.expunge_all()
+
+    learner = db_session.get(Learner, learner_id)
+    with count_queries() as statements:
+        learner.load_weak_words(db_session)
+    # One query for due reviews, one for lesson words, however many sessions exist
+    assert len(statements) == 2
+    assert len(learner.repetition_list) == 20
+
+    db_session.query(PracticeSession).filter_by(learner_id=learner_id).delete()
+    for lesson in db_session.query(Lesson).filter(Lesson.id.in_(lesson_ids)):
+        for word in lesson.words:
+            db_session.delete(word)
+        db_session.delete(lesson)
+    db_session.delete(learner)
+    db_session.commit()
+
+def test_sqlite_wal_profile_pragmas(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'profile.db'}", 'wal')
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+    default = make_engine(f"sqlite:///{tmp_path / 'default.db'}", 'default')
+    with default.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'delete'
+    default.dispose()
+    with pytest.raises(ValueError):
+        make_engine("sqlite:///unused.db", 'turbo')
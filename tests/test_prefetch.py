@@ -0,0 +1,56 @@
+# tests/test_prefetch.py
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import Future
+from unittest.mock import patch
+import lib.prefetch
+from lib.prefetch import QuizPrefetchPool, prefetch_quiz, get_quiz_pool
+
+def run_now(fn, *args):
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+def test_prefetch_pool_hits_and_bounds():
+    calls = []
+    def generator(language, level):
+        calls.append((language, level))
+        return [(f"{language} {level} q{len(calls)}", "a")]
+    pool = QuizPrefetchPool(generator, per_key=2, max_keys=1, submit=run_now)
+    assert pool.take("Spanish", "Beginner") is None
+    for _ in range(3):
+        pool.prefetch("Spanish", "Beginner")
+    assert len(calls) == 2  # third request is over the per-key bound
+    assert pool.take("Spanish", "Beginner") == [("Spanish Beginner q1", "a")]
+    pool.prefetch("French", "Advanced")  # max_keys=1 evicts the Spanish queue
+    assert pool.take("Spanish", "Beginner") is None
+    metrics = pool.metrics()
+    assert (metrics['hits'], metrics['misses'], metrics['prefetched']) == (1, 2, 3)
+    assert metrics['hit_rate'] == 1 / 3
+
+def test_prefetch_pool_expires_stale_quizzes():
+    pool = QuizPrefetchPool(lambda language, level: [("q", "a")], max_age=60, submit=run_now)
+    pool.prefetch("Spanish", "Beginner")
+    with patch('lib.prefetch.time.monotonic', return_value=10 ** 9):
+        assert pool.take("Spanish", "Beginner") is None
+    assert pool.metrics()['expired'] == 1
+
+def test_prefetch_skipped_without_api_key(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    assert prefetch_quiz("Spanish", "Beginner") is None
+
+def test_failed_ai_calls_are_not_pooled(monkeypatch):
+    monkeypatch.setattr(lib.prefetch, '_pool', None)
+    pool = get_quiz_pool()
+    pool._submit = run_now
+    with patch('lib.helpers.call_ai', return_value=None):
+        pool.prefetch("Spanish", "Beginner")
+    with patch('lib.helpers.call_ai', return_value="no quiz in here"):
+        pool.prefetch("Spanish", "Beginner")
+    assert pool.take("Spanish", "Beginner") is None
+    assert pool.metrics()['prefetched'] == 0
+    with patch('lib.helpers.call_ai', return_value="1. Question: Q? Answer: A"):
+        pool.prefetch("Spanish", "Beginner")
+    assert pool.take("Spanish", "Beginner") == [("Q?", "A")]
@@ -0,0 +1,101 @@
+# tests/test_progress.py
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+import lib.cli
+from lib.cli import cli, view_progress
+from lib.models import Session, Learner, PracticeSession
+from lib.progress import history_page, weekly_summary
+
+NOW = datetime(2026, 3, 4, 12, 0, tzinfo=timezone.utc)  # a Wednesday
+
+@pytest.fixture
+def history():
+    """A learner with 45 sessions, one every 12 hours up to NOW; two share a timestamp."""
+    session = Session()
+    learner = Learner(name=f"History_{uuid.uuid4().hex[:8]}", password="x", target_language="Spanish")
+    session.add(learner)
+    session.commit()
+    dates = [NOW - timedelta(hours=12 * i) for i in range(44, -1, -1)]
+    dates[20] = dates[21]
+    scores = [(i * 37) % 101 for i in range(45)]
+    session.add_all([PracticeSession(learner_id=learner.id, session_date=d, score=s) for d, s in zip(dates, scores)])
+    session.commit()
+    yield session, learner, scores
+    session.query(PracticeSession).filter_by(learner_id=learner.id).delete()
+    session.delete(learner)
+    session.commit()
+    session.close()
+
+def test_pages_walk_history_with_rolling_averages(history):
+    session, learner, scores = history
+    seen = []
+    page = history_page(session, learner.id, page_size=10, window=4)
+    pages = 1
+    while True:
+        seen.extend(page.rows)
+        if not page.has_more:
+            break
+        page = history_page(session, learner.id, before=page.next_cursor, page_size=10, window=4)
+        pages += 1
+    assert pages == 5 and len(seen) == 45
+    assert len({row.id for row in seen}) == 45
+
+    # Newest first, so the chronological position of seen[k] is 44 - k
+    for k, row in enumerate(seen):
+        i = 44 - k
+        window = scores[max(0, i - 3):i + 1]
+        assert row.score == scores[i]
+        assert row.rolling_avg == pytest.approx(sum(window) / len(window))
+        assert row.change == (scores[i] - scores[i - 1] if i else None)
+
+def test_weekly_summary_buckets_by_monday(history):
+    session, learner, scores = history
+    weeks = weekly_summary(session, learner.id, weeks=2, now=NOW)
+    # Two sessions a day; the current week runs from Monday 00:00 to Wednesday 12:00
+    assert [week.week for week in weeks] == ['2026-02-23', '2026-03-02']
+    assert [week.sessions for week in weeks] == [14, 6]
+    assert weeks[0].change is None
+    assert weeks[1].change == pytest.approx(weeks[1].average - weeks[0].average)
+    assert weeks[1].best == max(scores[-6:]) and weeks[1].worst == min(scores[-6:])
+
+def test_history_command_and_menu_paging(history, monkeypatch):
+    session, learner, scores = history
+    result = CliRunner().invoke(cli, ['history', '--learner', learner.name, '--page-size', '5', '--weeks', '0'])
+    assert result.exit_code == 0, result.output
+    assert "More: --before" in result.output
+    cursor = result.output.rsplit("--before ", 1)[1].strip()
+    older = CliRunner().invoke(cli, ['history', '--learner', learner.name, '--before', cursor])
+    assert older.output.count("\n2026-") == 20
+
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt', side_effect=['n', 'n', 'r']) as mock_prompt, patch('click.echo') as mock_echo:
+        view_progress()
+    assert mock_prompt.call_count == 3
+    lines = [str(call.args[0]) for call in mock_echo.call_args_list if call.args]
+    assert sum(1 for line in lines if line.startswith("2026-")) == 45
+
+def test_history_shows_fractional_scores_and_rejects_empty_window(history, monkeypatch):
+    session, learner, scores = history
+    # A 3-question quiz with 2 right scores 66.67
+    session.add(PracticeSession(learner_id=learner.id, session_date=NOW + timedelta(hours=1), score=2 * (100 / 3)))
+    session.commit()
+    result = CliRunner().invoke(cli, ['history', '--learner', learner.name, '--page-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert "66.7" in result.output
+    assert f"{2 * (100 / 3) - scores[-1]:+.1f}" in result.output
+
+    monkeypatch.setattr(lib.cli, 'current_user_id', learner.id)
+    with patch('click.prompt', side_effect=['r']), patch('click.echo'):
+        view_progress()
+
+    result = CliRunner().invoke(cli, ['history', '--learner', learner.name, '--window', '0'])
+    assert result.exit_code != 0 and "--window" in result.output
+    with pytest.raises(ValueError):
+        history_page(session, learner.id, window=0)
@@ -0,0 +1,68 @@
+# tests/test_query_plans.py
+import sys
+import os
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import event
+from lib.exporter import delta_query
+from lib.models import Base, Session, Learner, Word, LearnerStats, get_engine
+from lib.progress import history_page, weekly_summary
+
+@pytest.fixture
+def learner_and_word():
+    session = Session()
+    learner = Learner(name=f"Plan_{uuid.uuid4().hex[:8]}", password="x", target_language="Spanish")
+    word = Word(term=f"plan{uuid.uuid4().hex[:8]}", translation="plan")
+    session.add_all([learner, word])
+    session.commit()
+    yield session, learner, word
+    session.query(LearnerStats).filter_by(learner_id=learner.id).delete()
+    session.delete(word)
+    session.delete(learner)
+    session.commit()
+    session.close()
+
+def query_plans(run):
+    """Run run() and return (statement, [plan details]) for every query it issued."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'INSERT', 'DELETE')):
+            captured.append((statement, parameters))
+
+    event.listen(get_engine(), 'before_cursor_execute', record)
+    try:
+        run()
+    finally:
+        event.remove(get_engine(), 'before_cursor_execute', record)
+    with get_engine().connect() as conn:
+        return [(statement, [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+                for statement, parameters in captured]
+
+HOT_QUERIES = {
+    'learner_by_name': lambda session, learner, word: Learner.find_by_name(session, learner.name.upper()),
+    'word_by_term': lambda session, learner, word: Word.find_by_term(session, word.term.upper()),
+    'practiced_words': lambda session, learner, word: learner.practiced_words(session).all(),
+    'weak_words': lambda session, learner, word: learner.load_weak_words(session),
+    'due_words': lambda session, learner, word: learner.due_words(session, limit=10),
+    'delta_export': lambda session, learner, word: delta_query(session, learner, 'default', 10).all(),
+    'rebuild_stats': lambda session, learner, word: LearnerStats.rebuild(session, learner.id),
+    'sessions': lambda session, learner, word: learner.sessions,
+    'word_lessons': lambda session, learner, word: word.lessons,
+    'history_page': lambda session, learner, word: history_page(session, learner.id, before=1),
+    'weekly_summary': lambda session, learner, word: weekly_summary(session, learner.id),
+}
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_queries_use_indexes(learner_and_word, name):
+    session, learner, word = learner_and_word
+    session.expire(learner, ['sessions'])
+    session.expire(word, ['lessons'])
+    plans = query_plans(lambda: HOT_QUERIES[name](session, learner, word))
+    assert plans, f"{name} issued no queries"
+    for statement, details in plans:
+        # Scanning a small subquery (e.g. to apply a window function) is fine; scanning a table is not
+        scans = [detail for detail in details if detail.startswith('SCAN') and detail.split()[1] in Base.metadata.tables]
+        assert not scans, f"{name} scans a table: {scans}\n{statement}"
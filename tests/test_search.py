@@ -0,0 +1,90 @@
+# tests/test_search.py
+import sys
+import os
+import uuid
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from click.testing import CliRunner
+from lib.cli import cli
+from lib.importer import import_words
+from lib.models import Session, Word
+from lib.search import match_expression, search_words, rebuild_index
+
+@pytest.fixture
+def tag():
+    """A token no other test uses, so searches only see this test's words."""
+    tag = f"zq{uuid.uuid4().hex[:8]}"
+    yield tag
+    session = Session()
+    for word in session.query(Word).filter(Word.term.like(f"%{tag}%")):
+        session.delete(word)
+    session.commit()
+    session.close()
+
+def test_match_expression_quotes_user_input():
+    assert match_expression('café "OR" x*') == '"café"* "OR"* "x"*'
+    assert match_expression('buen día', prefix=False) == '"buen" "día"'
+    assert match_expression('  -- ') == ''
+
+def test_prefix_accent_insensitive_and_ranked(tag):
+    session = Session()
+    session.add_all([
+        Word(term=f"{tag} example", translation="other", example_sentence=f"Mentions canción {tag}."),
+        Word(term=f"{tag} canción", translation="song"),
+        Word(term=f"{tag} mañana", translation="tomorrow", example_sentence="Hasta mañana."),
+    ])
+    session.commit()
+
+    assert [w.translation for w in search_words(session, f"{tag} cancion")] == ["song", "other"]
+    assert [w.translation for w in search_words(session, f"{tag} MAN")] == ["tomorrow"]
+    assert search_words(session, f"{tag} man", prefix=False) == []
+    assert search_words(session, f"{tag} song")[0].term == f"{tag} canción"
+    assert len(search_words(session, tag, limit=2)) == 2
+    assert search_words(session, "") == []
+    session.close()
+
+def test_index_follows_updates_deletes_and_imports(tag, tmp_path):
+    session = Session()
+    word = Word(term=f"{tag} perro", translation="dog")
+    session.add(word)
+    session.commit()
+    word.translation = "hound"
+    session.commit()
+    assert search_words(session, f"{tag} dog") == []
+    assert [w.id for w in search_words(session, f"{tag} hound")] == [word.id]
+
+    path = tmp_path / "vocab.csv"
+    path.write_text(f"term,translation\n{tag} perro,puppy\n{tag} gato,cat\n", encoding='utf-8')
+    import_words(session, str(path))
+    session.expire_all()
+    assert [w.term for w in search_words(session, f"{tag} pupp")] == [f"{tag} perro"]
+    assert search_words(session, f"{tag} hound") == []
+    assert [w.term for w in search_words(session, f"{tag} ca")] == [f"{tag} gato"]
+
+    session.delete(session.get(Word, word.id))
+    session.commit()
+    assert search_words(session, f"{tag} perro") == []
+    rebuild_index(session)
+    assert [w.term for w in search_words(session, f"{tag} gato")] == [f"{tag} gato"]
+    session.close()
+
+def test_search_command(tag):
+    session = Session()
+    session.add(Word(term=f"{tag} hola", translation="hello"))
+    session.commit()
+    session.close()
+    result = CliRunner().invoke(cli, ['search', f"{tag} hol"])
+    assert result.exit_code == 0, result.output
+    assert f"{tag} hola -> hello" in result.output
+    assert "No matching words." in CliRunner().invoke(cli, ['search', f"{tag} nada"]).output
+
+def test_best_match_found_beyond_early_matches(tag):
+    session = Session()
+    # Thousands of weak matches (example sentence only) with lower ids than the strong one
+    session.execute(Word.__table__.insert(), [
+        {'term': f"{tag}filler{i}", 'translation': "x", 'example_sentence': f"about {tag}target"} for i in range(2100)])
+    session.add(Word(term=f"{tag}target", translation="the one"))
+    session.commit()
+    assert search_words(session, f"{tag}targ", limit=1)[0].translation == "the one"
+    session.close()
@@ -0,0 +1,48 @@
+# tests/test_seed.py
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from lib.models import Base, Learner, Word, Lesson, PracticeSession, LearnerStats, lesson_words, make_engine
+from lib.seed import generate_data, pseudo_word
+
+def generated(tmp_path, name, **sizes):
+    engine = make_engine(f"sqlite:///{tmp_path / name}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    counts = generate_data(session, **sizes)
+    return engine, session, counts
+
+def test_pseudo_words_are_unique():
+    terms = [pseudo_word(i) for i in range(20000)]
+    assert len(set(terms)) == len(terms)
+    assert all(term.isalpha() and len(term) >= 4 for term in terms)
+
+def test_generate_data_is_sized_and_deterministic(tmp_path):
+    sizes = dict(learners=30, words=400, sessions=3000, seed=7, chunk_size=500)
+    engine, session, counts = generated(tmp_path, "a.db", **sizes)
+    assert counts['learners'] == 30 and counts['words'] == 400 and counts['lessons'] == 20
+    assert session.query(PracticeSession).count() == 3000
+    assert session.query(func.count()).select_from(lesson_words).scalar() == counts['lesson_words']
+    assert session.query(func.sum(LearnerStats.session_count)).scalar() == 3000
+    low, avg, high = session.query(func.min(PracticeSession.score), func.avg(PracticeSession.score),
+                                   func.max(PracticeSession.score)).one()
+    assert 0 <= low < avg < high <= 100 and 45 < avg < 80
+
+    # Learners' levels follow their averages
+    for learner in session.query(Learner).join(LearnerStats):
+        expected = learner.proficiency_level
+        learner._apply_level()
+        assert learner.proficiency_level == expected
+
+    rows = session.query(PracticeSession.learner_id, PracticeSession.lesson_id, PracticeSession.score).order_by(PracticeSession.id).all()
+    session.close()
+    engine.dispose()
+
+    engine, session, _ = generated(tmp_path, "b.db", **sizes)
+    assert session.query(PracticeSession.learner_id, PracticeSession.lesson_id, PracticeSession.score).order_by(PracticeSession.id).all() == rows
+    assert session.query(Lesson).count() == 20 and session.query(Word).filter_by(term=pseudo_word(0)).one()
+    session.close()
+    engine.dispose()
@@ -0,0 +1,26 @@
+# tests/test_startup.py
+import sys
+import os
+import subprocess
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_importing_cli_defers_heavy_setup():
+    code = (
+        "import sys, lib.cli, lib.models, lib.helpers\n"
+        "assert 'openai' not in sys.modules, 'openai imported at startup'\n"
+        "assert 'dotenv' not in sys.modules, '.env loaded at startup'\n"
+        "assert lib.models._engine is None, 'engine created at startup'\n"
+        "assert lib.helpers._client is None, 'client created at startup'\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_app_reaches_first_menu():
+    sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+    try:
+        from bench_startup import time_startup
+    finally:
+        sys.path.pop(0)
+    assert len(time_startup(runs=1)) == 1
@@ -2,7 +2,8 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from lib.structures import DoublyLinkedList, GrammarTree
+from lib.structures import DoublyLinkedList, GrammarTree, WeightedSampler
+import random
 import pytest
 
 def test_doubly_linked_list():
@@ -13,9 +14,82 @@ def test_doubly_linked_list():
     dll.sort()
     assert dll.head.data == "word1"  # After sort: word1, word2
 
+def test_doubly_linked_list_index_and_dedup():
+    dll = DoublyLinkedList()
+    first = dll.add("hola")
+    dll.add("adios")
+    assert dll.add("hola") is first
+    assert len(dll) == 2
+    dll.move_to_end("hola")
+    assert list(dll) == ["adios", "hola"]
+    assert dll.remove("adios").data == "adios"
+    assert dll.search("adios") is None
+    assert dll.head is dll.tail is first
+
+def test_doubly_linked_list_merge_sort_is_stable():
+    dll = DoublyLinkedList()
+    for word in ["pera", "sol", "uva", "mar", "casa", "luz"]:
+        dll.add(word)
+    dll.sort(key=len)
+    assert list(dll) == ["sol", "uva", "mar", "luz", "pera", "casa"]
+    # Nodes are relinked rather than copied, so the index still points at them
+    assert dll.search("casa").prev.data == "pera"
+    assert dll.tail.data == "casa" and dll.head.prev is None
+
 def test_grammar_tree():
     tree = GrammarTree()
     tree.insert("verb")
     tree.insert("noun")
     result = tree.traverse_in_order(tree.root)
-    assert result == ["noun", "verb"]  # In-order: noun, verb
\ No newline at end of file
+    assert result == ["noun", "verb"]  # In-order: noun, verb
+
+def test_grammar_tree_stays_balanced_on_sorted_input():
+    tree = GrammarTree()
+    rules = [f"rule{i:05d}" for i in range(5000)]
+    for rule in rules:
+        tree.insert(rule)
+    assert len(tree) == 5000
+    assert tree.root.height <= 15  # AVL bound ~1.44*log2(n)
+    assert tree.traverse_in_order(tree.root) == rules
+
+def test_grammar_tree_bulk_load_and_queries():
+    rules = sorted(["noun: gender", "noun: plural", "verb: ser", "verb: estar", "adjective: agreement"])
+    tree = GrammarTree.from_sorted(rules)
+    assert list(tree) == rules
+    assert list(tree.prefix("verb:")) == ["verb: estar", "verb: ser"]
+    assert list(tree.range("noun", "verb")) == ["noun: gender", "noun: plural"]
+    assert list(tree.prefix("pronoun")) == []
+    with pytest.raises(ValueError):
+        GrammarTree.from_sorted(["b", "a"])
+
+def test_weighted_sampler_follows_weights():
+    sampler = WeightedSampler({'rare': 1.0, 'common': 3.0}, rng=random.Random(7))
+    draws = [sampler.sample() for _ in range(20000)]
+    assert 0.72 < draws.count('common') / len(draws) < 0.78
+    sampler.set('rare', 9.0)
+    draws = [sampler.sample() for _ in range(20000)]
+    assert 0.72 < draws.count('rare') / len(draws) < 0.78
+
+def test_weighted_sampler_set_remove_and_distinct():
+    sampler = WeightedSampler(rng=random.Random(1))
+    for i in range(10):
+        sampler.set(i, 1.0 + i)
+    sampler.remove(9)
+    sampler.remove(0)
+    assert len(sampler) == 8 and 9 not in sampler and 0 not in sampler
+    assert {sampler.sample() for _ in range(2000)} == set(range(1, 9))
+    drawn = sampler.sample_distinct(5)
+    assert len(set(drawn)) == 5
+    assert sorted(sampler.sample_distinct(50)) == list(range(1, 9))
+    # Drawing without replacement leaves every key and weight in place
+    assert len(sampler) == 8 and sampler.weight(4) == 5.0
+    with pytest.raises(ValueError):
+        sampler.set('x', 0)
+    with pytest.raises(IndexError):
+        WeightedSampler().sample()
+
+def test_weighted_sampler_recovers_from_stale_max():
+    sampler = WeightedSampler({'big': 1000.0, 'a': 1.0, 'b': 1.0}, rng=random.Random(3))
+    sampler.remove('big')
+    assert {sampler.sample() for _ in range(200)} == {'a', 'b'}
+    assert sampler._max == 1.0